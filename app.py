@@ -1,14 +1,47 @@
 
 """Minimal Flask application setup for the SQLAlchemy assignment."""
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 from flask import Flask, jsonify, request, redirect, url_for, render_template
-from flask_migrate import Migrate
+from sqlalchemy.exc import IntegrityError, OperationalError
 from models import User, Post
-from config import Config
+from cache import init_cache
+from config import get_config
+from counters import reconcile_command
+from etag import conditional, list_etag, user_etag
+from feed import feed_page, init_feed
+from group_commit import init_group_commit
+from ingest import BulkError, ingest_posts, ingest_users, read_records
+from instrumentation import init_instrumentation
+from integrity import integrity_command
+from metrics import init_metrics
+from pagination import (
+    PaginationError,
+    decode_cursor,
+    keyset_page,
+    page_args,
+    page_response,
+    parse_limit,
+    stream_response,
+)
+from projection import (
+    POST_FIELDS,
+    USER_FIELDS,
+    USER_POST_FIELDS,
+    VERIFY_POST_FIELDS,
+    FieldsError,
+    columns,
+    is_sparse,
+    requested_fields,
+)
+from replicas import replica_reads
+from reports import assemble_verify, integrity_report, table_totals, verify_statements
+from search import search_posts
+from seed import ensure_seeded, seed_command
+from serialization import init_json, rows_to_dicts
 
 # Shared DB extension instance
-from database import db
-
-migrate = Migrate()
+from database import db, init_db, init_migrate
 
 
 def create_app(test_config=None):
@@ -19,12 +52,18 @@ def create_app(test_config=None):
     """
 
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config())
     if test_config:
         app.config.update(test_config)
 
-    db.init_app(app)
-    migrate.init_app(app, db)
+    init_db(app)
+    init_json(app)
+    init_metrics(app)
+    init_instrumentation(app)
+    user_cache = init_cache(app)
+    group_commit = init_group_commit(app)
+    init_feed(app)
+    init_migrate(app)
 
     # Import models so they're registered with SQLAlchemy
     import models  # noqa: F401
@@ -33,44 +72,16 @@ def create_app(test_config=None):
     def make_shell_context():
         return {"db": db, "User": User, "Post": Post}
 
-    @app.before_request
-    def init_db():
-        """Initialize database with sample data if empty (skip in testing mode)."""
-        if app.config.get("TESTING"):
-            return
-
-        if User.query.first() is None:
-            with app.app_context():
-                user1 = User(username="alice", email="alice@example.com")
-                user2 = User(username="bob", email="bob@example.com")
-                user3 = User(username="charlie", email="charlie@example.com")
-
-                db.session.add_all([user1, user2, user3])
-                db.session.commit()
-
-                post1 = Post(
-                    title="First Post",
-                    content="This is Alice's first post",
-                    user_id=user1.id,
-                )
-                post2 = Post(
-                    title="Hello World",
-                    content="Bob's introduction to blogging",
-                    user_id=user2.id,
-                )
-                post3 = Post(
-                    title="Learning SQLAlchemy",
-                    content="Charlie explores database relationships",
-                    user_id=user3.id,
-                )
-                post4 = Post(
-                    title="Second Post",
-                    content="Alice's second post about Flask",
-                    user_id=user1.id,
-                )
-
-                db.session.add_all([post1, post2, post3, post4])
-                db.session.commit()
+    app.cli.add_command(seed_command)
+    app.cli.add_command(reconcile_command)
+    app.cli.add_command(integrity_command)
+
+    if app.config.get("AUTO_SEED") and not app.config.get("TESTING"):
+
+        @app.before_request
+        def seed_once():
+            """Seed sample data once per process (skip in testing mode)."""
+            ensure_seeded()
 
     @app.route("/")
     def index():
@@ -78,48 +89,50 @@ def create_app(test_config=None):
         return jsonify({"message": "Welcome to the Flask + SQLAlchemy assignment"})
 
     @app.route("/verify", methods=["GET"])
+    @replica_reads
     def verify():
-        """Verify foreign key relationships between User and Post."""
-        users_count = User.query.count()
-        posts_count = Post.query.count()
-
-        verify_data = {"users_count": users_count, "posts_count": posts_count, "users": [], "posts": []}
-
-        for user in User.query.all():
-            user_data = {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "posts_count": len(user.posts),
-                "posts": [{"id": p.id, "title": p.title} for p in user.posts],
-            }
-            verify_data["users"].append(user_data)
-
-        for post in Post.query.all():
-            author = None
-            if post.user is not None:
-                author = {"id": post.user.id, "username": post.user.username, "email": post.user.email}
-
-            post_data = {
-                "id": post.id,
-                "title": post.title,
-                "content": post.content,
-                "user_id": post.user_id,
-                "author": author,
-            }
-            verify_data["posts"].append(post_data)
+        """Verify foreign key relationships between User and Post.
+
+        ``?summary=1`` returns only the SQL-aggregated counts and orphan check
+        without loading any rows. ``?fields=`` limits the attributes listed
+        for each entry of ``posts``.
+        """
+        if request.args.get("summary", type=int):
+            return jsonify(integrity_report()), 200
+        try:
+            post_fields = requested_fields(VERIFY_POST_FIELDS)
+        except FieldsError as exc:
+            return jsonify({"message": str(exc)}), 400
+
+        # Two column-only selects build both sections; no ORM objects are
+        # hydrated and the query count does not grow with row count.
+        users_stmt, posts_stmt = verify_statements("content" in post_fields)
+        verify_data = assemble_verify(
+            table_totals(),
+            db.session.execute(users_stmt),
+            db.session.execute(posts_stmt),
+            post_fields,
+        )
 
         return jsonify(verify_data), 200
 
     @app.route("/users", methods=["GET", "POST"])
+    @replica_reads
+    @conditional(lambda: list_etag("users"))
     def users():
-        """List all users or create a new user."""
+        """List users one keyset page at a time, or create a new user."""
         if request.method == "GET":
-            user_list = User.query.all()
-            result = [
-                {"id": user.id, "username": user.username, "email": user.email} for user in user_list
-            ]
-            return jsonify(result), 200
+            try:
+                limit, after_id, stream = page_args()
+                names = requested_fields(USER_FIELDS)
+            except (PaginationError, FieldsError) as exc:
+                return jsonify({"message": str(exc)}), 400
+
+            stmt = db.select(*columns(USER_FIELDS, names))
+            if stream:
+                return stream_response(stmt, User.id, after_id, stream)
+            rows, next_cursor = keyset_page(stmt, User.id, limit, after_id)
+            return page_response(rows, next_cursor), 200
 
         data = request.get_json() or {}
         username = data.get("username")
@@ -134,37 +147,112 @@ def create_app(test_config=None):
 
         return jsonify({"id": new_user.id, "username": new_user.username, "email": new_user.email}), 201
 
+    def bulk_response(ingest):
+        """Run a bulk ingest over the request body and summarise per-row results."""
+        chunk_size = request.args.get("chunk_size", app.config["BULK_CHUNK_SIZE"], type=int)
+        if not chunk_size or chunk_size < 1:
+            return jsonify({"message": "chunk_size must be a positive integer"}), 400
+        try:
+            result = ingest(read_records(), chunk_size)
+        except BulkError as exc:
+            return jsonify({"message": str(exc)}), 400
+
+        if result["errors"] and not result["inserted"]:
+            return jsonify(result), 400
+        return jsonify(result), 200 if result["errors"] else 201
+
+    @app.route("/users/bulk", methods=["POST"])
+    def users_bulk():
+        """Create many users from a JSON array or NDJSON stream."""
+        return bulk_response(ingest_users)
+
+    def load_user_posts(user_id, names=tuple(USER_POST_FIELDS)):
+        return rows_to_dicts(
+            db.session.execute(
+                db.select(*columns(USER_POST_FIELDS, names))
+                .where(Post.user_id == user_id)
+                .order_by(Post.id)
+            )
+        )
+
+    def load_user(user_id):
+        user = db.session.execute(
+            db.select(User.id, User.username, User.email).where(User.id == user_id)
+        ).first()
+        if user is None:
+            return None
+        payload = user._asdict()
+        payload["posts"] = load_user_posts(user_id)
+        return payload
+
+    def load_user_with_posts(user_id, names=tuple(USER_POST_FIELDS)):
+        username = db.session.execute(
+            db.select(User.username).where(User.id == user_id)
+        ).scalar()
+        if username is None:
+            return None
+        return {"user_id": user_id, "username": username, "posts": load_user_posts(user_id, names)}
+
+    def load_author(user_id):
+        """Return ``(id, username)`` of a post's author, or ``None``.
+
+        A single primary-key probe that both validates the foreign key and
+        supplies the name for the response, without loading a ``User``.
+        """
+        return db.session.execute(
+            db.select(User.id, User.username).where(User.id == user_id)
+        ).first()
+
+    def insert_post(title, content, user_id):
+        """Insert a post through the ORM and return its id, or ``None`` on a FK error.
+
+        The id is read at flush time so the commit's expiry does not cost a
+        refresh ``SELECT``. A concurrent author delete that the probe missed
+        surfaces as an ``IntegrityError`` when foreign keys are enforced.
+        """
+        new_post = Post(title=title, content=content, user_id=user_id)
+        db.session.add(new_post)
+        try:
+            db.session.flush()
+            post_id = new_post.id
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return None
+        return post_id
+
     @app.route("/users/<int:user_id>", methods=["GET"])
+    @replica_reads
+    @conditional(user_etag)
     def get_user(user_id):
-        """Get a user by ID."""
-        user = db.session.get(User, user_id)
-        if not user:
+        """Get a user by ID (served from the user cache when warm)."""
+        payload = user_cache.get_or_load(f"user:{user_id}", lambda: load_user(user_id))
+        if payload is None:
             return jsonify({"message": "User not found"}), 404
-
-        return (
-            jsonify(
-                {
-                    "id": user.id,
-                    "username": user.username,
-                    "email": user.email,
-                    "posts": [
-                        {"id": p.id, "title": p.title, "content": p.content} for p in user.posts
-                    ],
-                }
-            ),
-            200,
-        )
+        return jsonify(payload), 200
 
     @app.route("/users/<int:user_id>/posts", methods=["GET"])
+    @replica_reads
+    @conditional(user_etag)
     def get_user_posts(user_id):
-        """Get all posts for a specific user."""
-        user = db.session.get(User, user_id)
-        if not user:
+        """Get all posts for a specific user (served from the user cache when warm).
+
+        Sparse ``?fields=`` requests bypass the cache and select only the
+        requested post columns.
+        """
+        if is_sparse():
+            try:
+                names = requested_fields(USER_POST_FIELDS)
+            except FieldsError as exc:
+                return jsonify({"message": str(exc)}), 400
+            payload = load_user_with_posts(user_id, names)
+        else:
+            payload = user_cache.get_or_load(
+                f"user:{user_id}:posts", lambda: load_user_with_posts(user_id)
+            )
+        if payload is None:
             return jsonify({"message": "User not found"}), 404
-
-        posts = [{"id": p.id, "title": p.title, "content": p.content} for p in user.posts]
-
-        return jsonify({"user_id": user.id, "username": user.username, "posts": posts}), 200
+        return jsonify(payload), 200
 
     @app.route("/adduser", methods=["GET"])
     def adduser():
@@ -200,34 +288,33 @@ def create_app(test_config=None):
             if not title or not content or not user_id:
                 return render_template("addpost.html", message="Title, content, and user_id are required")
 
-            user = db.session.get(User, user_id)
-            if not user:
+            author = load_author(user_id)
+            if author is None or insert_post(title, content, author.id) is None:
                 return render_template("addpost.html", message="User not found")
 
-            new_post = Post(title=title, content=content, user_id=user_id)
-            db.session.add(new_post)
-            db.session.commit()
-
             return redirect(url_for("posts"))
 
         return render_template("addpost.html")
 
     @app.route("/posts", methods=["GET", "POST"])
+    @replica_reads
+    @conditional(lambda: list_etag("posts", "users"))
     def posts():
-        """List or create posts."""
+        """List posts one keyset page at a time, or create a post."""
         if request.method == "GET":
-            post_list = Post.query.all()
-            result = [
-                {
-                    "id": post.id,
-                    "title": post.title,
-                    "content": post.content,
-                    "user_id": post.user_id,
-                    "username": post.user.username if post.user is not None else None,
-                }
-                for post in post_list
-            ]
-            return jsonify(result), 200
+            try:
+                limit, after_id, stream = page_args()
+                names = requested_fields(POST_FIELDS)
+            except (PaginationError, FieldsError) as exc:
+                return jsonify({"message": str(exc)}), 400
+
+            stmt = db.select(*columns(POST_FIELDS, names)).select_from(Post)
+            if "username" in names:
+                stmt = stmt.outerjoin(User, Post.user_id == User.id)
+            if stream:
+                return stream_response(stmt, Post.id, after_id, stream)
+            rows, next_cursor = keyset_page(stmt, Post.id, limit, after_id)
+            return page_response(rows, next_cursor), 200
 
         data = request.get_json() or {}
         title = data.get("title")
@@ -237,36 +324,91 @@ def create_app(test_config=None):
         if not title or not content or not user_id:
             return jsonify({"message": "Title, content, and user_id are required"}), 400
 
-        user = db.session.get(User, user_id)
-        if not user:
+        author = load_author(user_id)
+        if author is None:
             return jsonify({"message": "User not found"}), 400
 
-        new_post = Post(title=title, content=content, user_id=user_id)
-        db.session.add(new_post)
-        db.session.commit()
+        if group_commit is not None:
+            # Release the read transaction before waiting on the shared writer.
+            db.session.rollback()
+            try:
+                post_id = group_commit.submit(
+                    {"title": title, "content": content, "user_id": author.id}
+                ).result(timeout=app.config["GROUP_COMMIT_TIMEOUT"])
+            except IntegrityError:
+                # The author was deleted between the probe and the commit.
+                return jsonify({"message": "User not found"}), 400
+            except FutureTimeoutError:
+                message = "Timed out waiting for the write; the post may still be created"
+                return jsonify({"message": message}), 503
+            except OperationalError as exc:
+                return jsonify({"message": f"Database unavailable: {exc.orig}"}), 503
+        else:
+            post_id = insert_post(title, content, author.id)
+            if post_id is None:
+                return jsonify({"message": "User not found"}), 400
 
         return (
             jsonify(
                 {
-                    "id": new_post.id,
-                    "title": new_post.title,
-                    "content": new_post.content,
-                    "user_id": new_post.user_id,
-                    "username": new_post.user.username,
+                    "id": post_id,
+                    "title": title,
+                    "content": content,
+                    "user_id": author.id,
+                    "username": author.username,
                 }
             ),
             201,
         )
 
-    return app
-
+    @app.route("/feed", methods=["GET"])
+    @replica_reads
+    def feed():
+        """Newest posts across all users with their authors, newest first.
+
+        Pages continue with ``?after=`` from ``X-Next-Cursor``; ``?fields=``
+        narrows each entry as on ``/posts``.
+        """
+        try:
+            limit = parse_limit(request.args)
+            after = request.args.get("after")
+            after_id = decode_cursor(after) if after else None
+            names = requested_fields(POST_FIELDS)
+        except (PaginationError, FieldsError) as exc:
+            return jsonify({"message": str(exc)}), 400
+        rows, next_cursor = feed_page(limit, after_id, names)
+        return page_response(rows, next_cursor), 200
+
+    @app.route("/posts/search", methods=["GET"])
+    def search():
+        """Full-text search over post titles and content, best matches first."""
+        try:
+            limit = parse_limit(request.args)
+            rows, next_cursor = search_posts(
+                request.args.get("q", ""), limit, request.args.get("after")
+            )
+        except PaginationError as exc:
+            return jsonify({"message": str(exc)}), 400
+        return page_response(rows, next_cursor), 200
+
+    @app.route("/posts/bulk", methods=["POST"])
+    def posts_bulk():
+        """Create many posts from a JSON array or NDJSON stream."""
+        return bulk_response(ingest_posts)
 
-# Expose a module-level application for convenience with certain tools
-app = create_app()
+    return app
 
 
+def __getattr__(name):
+    # ``flask --app app`` and ``gunicorn app:app`` build the app on first
+    # access; importing ``create_app`` or ``db`` (tests, scripts) does not
+    # create an engine against the configured database.
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-            # Running ``python app.py`` starts the development server.
-    app.run(debug=True)
+    # Running ``python app.py`` starts the development server.
+    create_app().run(debug=True)
@@ -0,0 +1,233 @@
+"""ASGI application serving the read endpoints on SQLAlchemy's asyncio engine.
+
+The Flask app ties up a worker thread for every request, including the time
+spent waiting on the database and on slow clients. This module serves the
+same read routes (``/users``, ``/posts``, ``/users/<id>``,
+``/users/<id>/posts`` and ``/verify``) as a plain ASGI callable on an
+``AsyncEngine``, so one process can keep thousands of connections open while
+queries are in flight. It shares the ``User``/``Post`` models, config,
+pagination cursors, ``fields=`` projection and report builders with the
+Flask app, and returns the same JSON shapes.
+
+Writes, streaming, ETags and the per-user cache stay on the Flask app.
+
+Run it with any ASGI server, for example::
+
+    uvicorn asgi:app
+
+The database URL is ``ASYNC_DATABASE_URL`` if set; otherwise
+``SQLALCHEMY_DATABASE_URI`` with ``sqlite://`` mapped to the aiosqlite driver
+and relative paths resolved against the instance folder, as Flask-SQLAlchemy
+does, so both apps open the same file.
+"""
+import os
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import make_url, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config import get_config
+from database import apply_sqlite_pragmas
+from models import Post, User
+from pagination import PaginationError, finish_page, keyset_statement, page_args
+from projection import (
+    POST_FIELDS,
+    USER_FIELDS,
+    USER_POST_FIELDS,
+    VERIFY_POST_FIELDS,
+    FieldsError,
+    columns,
+    requested_fields,
+)
+from reports import (
+    assemble_verify,
+    posts_per_user_statement,
+    table_totals_statement,
+    verify_statements,
+)
+from serialization import dumps_bytes, rows_to_dicts
+
+
+class HTTPError(Exception):
+    """Raised by handlers to answer with ``{"message": ...}`` and ``status``."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# Flask's default instance folder for ``app.py``, which sits next to this file.
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance")
+
+
+def async_database_url(config, instance_path=INSTANCE_PATH):
+    """Return the asyncio driver URL for ``config``."""
+    if config.get("ASYNC_DATABASE_URL"):
+        return config["ASYNC_DATABASE_URL"]
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "sqlite":
+        raise ValueError("Set ASYNC_DATABASE_URL to an asyncio driver URL for this backend")
+    if url.database not in (None, "", ":memory:") and not os.path.isabs(url.database):
+        os.makedirs(instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(instance_path, url.database))
+    return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+
+class AsyncReadApp:
+    """ASGI callable routing the read endpoints to async handlers."""
+
+    def __init__(self, config):
+        self.config = config
+        options = {}
+        if not config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+            options.update(
+                pool_size=config["DB_POOL_SIZE"],
+                max_overflow=config["DB_MAX_OVERFLOW"],
+                pool_timeout=config["DB_POOL_TIMEOUT"],
+                pool_recycle=config["DB_POOL_RECYCLE"],
+                pool_pre_ping=config["DB_POOL_PRE_PING"],
+            )
+        self.engine = create_async_engine(async_database_url(config), **options)
+        if config.get("SQLITE_PRAGMAS") and self.engine.dialect.name == "sqlite":
+            apply_sqlite_pragmas(self.engine.sync_engine, config["SQLITE_PRAGMAS"])
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.routes = [
+            (re.compile(r"^/users$"), self.users),
+            (re.compile(r"^/posts$"), self.posts),
+            (re.compile(r"^/users/(?P<user_id>\d+)$"), self.get_user),
+            (re.compile(r"^/users/(?P<user_id>\d+)/posts$"), self.get_user_posts),
+            (re.compile(r"^/verify$"), self.verify),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        headers = [(b"content-type", b"application/json")]
+        try:
+            handler, params = self._match(scope["path"])
+            if scope["method"] not in ("GET", "HEAD"):
+                raise HTTPError(405, "Method not allowed")
+            args = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+            async with self.sessions() as session:
+                payload, extra_headers = await handler(session, args, **params)
+            status = 200
+            headers.extend(extra_headers)
+        except HTTPError as exc:
+            status, payload = exc.status, {"message": exc.message}
+        except (PaginationError, FieldsError) as exc:
+            status, payload = 400, {"message": str(exc)}
+
+        body = dumps_bytes(payload) + b"\n"
+        headers.append((b"content-length", str(len(body)).encode("ascii")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD":
+            body = b""
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _match(self, path):
+        for pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                return handler, {name: int(value) for name, value in match.groupdict().items()}
+        raise HTTPError(404, "Not found")
+
+    async def _page(self, session, args, stmt, id_column, path):
+        limit, after_id, stream = page_args(args, self.config)
+        if stream:
+            raise HTTPError(400, "Streaming is only served by the WSGI app")
+        result = await session.execute(keyset_statement(stmt, id_column, limit, after_id))
+        rows, next_cursor = finish_page(rows_to_dicts(result), id_column, limit)
+        headers = []
+        if next_cursor is not None:
+            link = f'<{path}?{urlencode({**args, "after": next_cursor})}>; rel="next"'
+            headers = [(b"x-next-cursor", next_cursor.encode()), (b"link", link.encode())]
+        return rows, headers
+
+    async def users(self, session, args):
+        names = requested_fields(USER_FIELDS, args=args)
+        stmt = select(*columns(USER_FIELDS, names))
+        return await self._page(session, args, stmt, User.id, "/users")
+
+    async def posts(self, session, args):
+        names = requested_fields(POST_FIELDS, args=args)
+        stmt = select(*columns(POST_FIELDS, names)).select_from(Post)
+        if "username" in names:
+            stmt = stmt.outerjoin(User, Post.user_id == User.id)
+        return await self._page(session, args, stmt, Post.id, "/posts")
+
+    async def _user_posts(self, session, user_id, names):
+        result = await session.execute(
+            select(*columns(USER_POST_FIELDS, names))
+            .where(Post.user_id == user_id)
+            .order_by(Post.id)
+        )
+        return rows_to_dicts(result)
+
+    async def get_user(self, session, args, user_id):
+        result = await session.execute(
+            select(User.id, User.username, User.email).where(User.id == user_id)
+        )
+        user = result.first()
+        if user is None:
+            raise HTTPError(404, "User not found")
+        payload = user._asdict()
+        payload["posts"] = await self._user_posts(session, user_id, list(USER_POST_FIELDS))
+        return payload, []
+
+    async def get_user_posts(self, session, args, user_id):
+        names = requested_fields(USER_POST_FIELDS, args=args)
+        username = (
+            await session.execute(select(User.username).where(User.id == user_id))
+        ).scalar()
+        if username is None:
+            raise HTTPError(404, "User not found")
+        posts = await self._user_posts(session, user_id, names)
+        return {"user_id": user_id, "username": username, "posts": posts}, []
+
+    async def verify(self, session, args):
+        totals = (await session.execute(table_totals_statement())).one()._asdict()
+        if args.get("summary", "").isdigit() and int(args["summary"]):
+            stmt = posts_per_user_statement(self.engine.dialect.name)
+            totals["users"] = rows_to_dicts(await session.execute(stmt))
+            return totals, []
+
+        post_fields = requested_fields(VERIFY_POST_FIELDS, args=args)
+        users_stmt, posts_stmt = verify_statements(
+            "content" in post_fields, self.engine.dialect.name
+        )
+        user_rows = (await session.execute(users_stmt)).all()
+        post_rows = (await session.execute(posts_stmt)).all()
+        return assemble_verify(totals, user_rows, post_rows, post_fields), []
+
+
+def create_asgi_app(test_config=None):
+    """Build an ``AsyncReadApp`` from the active config plus ``test_config``."""
+    config_class = get_config()
+    config = {name: getattr(config_class, name) for name in dir(config_class) if name.isupper()}
+    if test_config:
+        config.update(test_config)
+    return AsyncReadApp(config)
+
+
+def __getattr__(name):
+    # ``uvicorn asgi:app`` builds the app on first access, not at import time.
+    if name == "app":
+        globals()["app"] = create_asgi_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
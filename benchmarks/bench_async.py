@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Load test: threaded WSGI app vs the ASGI read app under many concurrent clients.
+
+Usage: ``python benchmarks/bench_async.py [requests] [concurrency ...]``
+
+Seeds a temporary SQLite database, serves it once through Werkzeug's threaded
+WSGI server and once through uvicorn running ``asgi:app``, then fires
+``requests`` GETs at a mix of read routes from ``concurrency`` simultaneous
+keep-alive-less clients and reports throughput and latency percentiles.
+Requires ``uvicorn`` and ``aiosqlite``.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from seed import seed_synthetic_data  # noqa: E402
+
+PATHS = ["/users?limit=50", "/posts?limit=50&fields=id,title", "/users/7", "/users/13/posts"]
+
+WSGI_SERVER = """
+import sys
+sys.path.insert(0, {root!r})
+from werkzeug.serving import WSGIRequestHandler, make_server
+from app import create_app
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+app = create_app({{"SQLALCHEMY_DATABASE_URI": {url!r}, "AUTO_SEED": False, "CACHE_BACKEND": "null"}})
+make_server("127.0.0.1", {port}, app, threaded=True, request_handler=QuietHandler).serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return data.startswith(b"HTTP/1.1 200") or data.startswith(b"HTTP/1.0 200")
+
+
+async def load(port, requests, concurrency):
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(PATHS[i % len(PATHS)])
+    latencies, failures = [], 0
+
+    async def client():
+        nonlocal failures
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            ok = await fetch(port, path)
+            latencies.append(time.perf_counter() - start)
+            failures += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return requests / elapsed, p50, p99, failures
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    levels = [int(level) for level in sys.argv[2:]] or [1, 16, 128]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'load.db'}"
+        app = create_app({"SQLALCHEMY_DATABASE_URI": url, "TESTING": True})
+        with app.app_context():
+            db.create_all()
+            seed_synthetic_data(2000, 10)
+
+        servers = {}
+        port = free_port()
+        script = WSGI_SERVER.format(root=str(ROOT), url=url, port=port)
+        servers["wsgi (threaded)"] = (subprocess.Popen([sys.executable, "-c", script]), port)
+        port = free_port()
+        env = dict(os.environ, DATABASE_URL=url, AUTO_SEED="0")
+        servers["asgi (uvicorn)"] = (
+            subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port),
+                 "--log-level", "warning"],
+                cwd=ROOT,
+                env=env,
+            ),
+            port,
+        )
+        try:
+            for label, (_, port) in servers.items():
+                wait_for(port)
+                for concurrency in levels:
+                    rps, p50, p99, failures = asyncio.run(load(port, requests, concurrency))
+                    print(
+                        f"{label:<16} c={concurrency:<4} {rps:8.0f} req/s  "
+                        f"p50={p50 * 1000:7.1f}ms  p99={p99 * 1000:7.1f}ms  failures={failures}"
+                    )
+        finally:
+            for process, _ in servers.values():
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""POST /posts throughput with and without group commit.
+
+Usage: ``python benchmarks/bench_group_commit.py [seconds] [clients ...]``
+
+Each client is a thread posting through its own ``app.test_client()`` for
+``seconds``. Runs every client count (default 1, 8 and 64) against a WAL
+database with ``synchronous=FULL`` (an fsync per commit) and ``NORMAL``,
+once committing per request and once with ``GROUP_COMMIT_ENABLED``.
+"""
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from config import ProductionConfig  # noqa: E402
+from models import User  # noqa: E402
+
+
+def run(db_path, synchronous, group_commit, clients, seconds):
+    pragmas = dict(ProductionConfig.SQLITE_PRAGMAS, synchronous=synchronous)
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+            "SQLITE_PRAGMAS": pragmas,
+            "AUTO_SEED": False,
+            "CACHE_BACKEND": "null",
+            "GROUP_COMMIT_ENABLED": group_commit,
+            "GROUP_COMMIT_MAX_DELAY_MS": 2,
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": clients + 2, "max_overflow": 0},
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="writer"))
+        db.session.commit()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        http = app.test_client()
+        mine = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = http.post("/posts", json={"title": "t", "content": "c" * 200, "user_id": 1})
+            if response.status_code != 201:
+                errors.append(response.status_code)
+                continue
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    committer = app.extensions.get("group_commit")
+    batch = committer.snapshot()["mean_batch"] if committer else 1.0
+    if committer:
+        committer.close()
+    with app.app_context():
+        db.engine.dispose()
+    latencies.sort()
+    return {
+        "posts_per_s": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "mean_batch": batch,
+        "errors": len(errors),
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    client_counts = [int(arg) for arg in sys.argv[2:]] or [1, 8, 64]
+    print(f"{'synchronous':<12}{'clients':>8}  {'mode':<14}{'posts/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'batch':>7}{'errors':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for synchronous in ("FULL", "NORMAL"):
+            for clients in client_counts:
+                for group_commit in (False, True):
+                    path = Path(tmp) / f"{synchronous}-{clients}-{group_commit}.db"
+                    stats = run(path, synchronous, group_commit, clients, seconds)
+                    mode = "group commit" if group_commit else "per request"
+                    print(
+                        f"{synchronous:<12}{clients:>8}  {mode:<14}{stats['posts_per_s']:>9.0f}"
+                        f"{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                        f"{stats['mean_batch']:>7.1f}{stats['errors']:>7}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Compare ``GET /`` latency with and without a per-request seeding query.
+
+Usage: ``python benchmarks/bench_index.py [requests]``
+
+"before" reproduces the old hook that ran ``User.query.first()`` ahead of
+every request; "after" is the current once-per-process check.
+"""
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from models import User  # noqa: E402
+
+
+def build_app(db_path, per_request_check):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "AUTO_SEED": True})
+    if per_request_check:
+
+        @app.before_request
+        def check_seeded():
+            User.query.first()
+
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def measure(app, requests):
+    client = app.test_client()
+    client.get("/")  # warm-up and one-off seeding
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get("/")
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, per_request_check in (("before", True), ("after", False)):
+            app = build_app(Path(tmp) / f"{label}.db", per_request_check)
+            p50, p99 = measure(app, requests)
+            print(f"{label:<7} p50={p50:8.1f}us  p99={p99:8.1f}us  ({requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
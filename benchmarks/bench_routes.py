@@ -0,0 +1,50 @@
+"""Latency, query-count and memory benchmarks for every route.
+
+See ``benchmarks/conftest.py`` for how to run and configure the suite.
+"""
+import itertools
+
+import pytest
+
+_unique = itertools.count()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/",
+        "/users",
+        "/users?limit=1000",
+        "/posts",
+        "/posts?limit=1000&fields=id,title",
+        "/feed",
+        "/feed?limit=1000",
+        "/users/1",
+        "/users/1/posts",
+        "/posts/search?q=post",
+        "/verify?summary=1",
+    ],
+)
+def test_read_routes(bench, url):
+    bench("GET", url)
+
+
+def test_verify_full_report(bench):
+    bench("GET", "/verify?fields=id,title")
+
+
+def test_stream_posts(bench):
+    bench("GET", "/posts?stream=ndjson")
+
+
+def test_create_user(bench):
+    bench("POST", "/users", expected_status=201, json=lambda: {"username": f"bench{next(_unique)}"})
+
+
+def test_create_post(bench):
+    bench("POST", "/posts", expected_status=201, json={"title": "T", "content": "C", "user_id": 1})
+
+
+def test_bulk_posts(bench):
+    rows = [{"title": f"T{i}", "content": "C", "user_id": 1 + i % 50} for i in range(500)]
+    bench("POST", "/posts/bulk", expected_status=201, json=rows)
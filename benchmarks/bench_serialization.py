@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Serialisation throughput per 10k post rows.
+
+Usage: ``python benchmarks/bench_serialization.py [rows]``
+
+Compares the old path (query and hydrate ``Post`` objects, build dicts,
+stdlib JSON with sorted keys) against Core rows through ``rows_to_dicts``
+with each JSON provider. "incl. query" rows time the same work as the ORM
+path; "Core rows" rows time only dict building and encoding of pre-fetched
+rows.
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from models import Post, User  # noqa: E402
+from serialization import orjson, rows_to_dicts  # noqa: E402
+from seed import seed_synthetic_data  # noqa: E402
+
+REPEAT = 5
+
+
+def timed(fn):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    results = {}
+    providers = ("stdlib", "orjson") if orjson is not None else ("stdlib",)
+    if orjson is None:
+        print("orjson is not installed; timing the stdlib provider only", file=sys.stderr)
+    for provider in providers:
+        app = create_app(
+            {"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "TESTING": True, "JSON_PROVIDER": provider}
+        )
+        with app.app_context():
+            db.create_all()
+            seed_synthetic_data(rows // 10, 10)
+            stmt = db.select(Post.id, Post.title, Post.content, Post.user_id, User.username).join(User)
+
+            if provider == "stdlib":
+
+                def orm_path():
+                    db.session.expunge_all()
+                    payload = [
+                        {
+                            "id": p.id,
+                            "title": p.title,
+                            "content": p.content,
+                            "user_id": p.user_id,
+                            "username": p.user.username,
+                        }
+                        for p in Post.query.join(User).options(db.contains_eager(Post.user))
+                    ]
+                    app.json.response(payload)
+
+                app.json.sort_keys = True
+                results["ORM objects + stdlib (sorted)"] = timed(orm_path)
+                app.json.sort_keys = False
+
+            result = db.session.execute(stmt).all()
+
+            def core_path():
+                keys = ["id", "title", "content", "user_id", "username"]
+                app.json.response([dict(zip(keys, row)) for row in result])
+
+            results[f"Core rows + {provider}"] = timed(core_path)
+            results[f"rows_to_dicts + {provider} (incl. query)"] = timed(
+                lambda: app.json.response(rows_to_dicts(db.session.execute(stmt)))
+            )
+
+    scale = 10000 / rows
+    for label, seconds in results.items():
+        print(f"{label:<42} {seconds * scale * 1000:8.2f} ms / 10k rows  ({rows / seconds:10.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
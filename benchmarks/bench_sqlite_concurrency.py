@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Concurrent read/write throughput under the default and production SQLite profiles.
+
+Usage: ``python benchmarks/bench_sqlite_concurrency.py [seconds] [readers] [writers]``
+
+Readers page through ``posts`` while writers insert one post per transaction.
+The report shows operations completed, how many failed with "database is
+locked", and the worst single-operation wait per profile.
+"""
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from sqlalchemy import exc, insert, select  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from config import Config, ProductionConfig  # noqa: E402
+from models import Post, User  # noqa: E402
+
+
+def run_profile(db_path, pragmas, seconds, readers, writers):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "SQLITE_PRAGMAS": pragmas})
+    stats = {"reads": 0, "writes": 0, "locked": 0, "max_wait": 0.0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(insert(User), [{"username": "writer"}])
+        engine = db.engine
+
+    def worker(write):
+        key = "writes" if write else "reads"
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if write:
+                    with engine.begin() as conn:
+                        conn.execute(insert(Post).values(title="t", content="c" * 200, user_id=1))
+                else:
+                    with engine.connect() as conn:
+                        conn.execute(select(Post.id, Post.title).order_by(Post.id.desc()).limit(50)).all()
+            except exc.OperationalError:
+                with lock:
+                    stats["locked"] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                stats[key] += 1
+                stats["max_wait"] = max(stats["max_wait"], elapsed)
+
+    threads = [threading.Thread(target=worker, args=(False,)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=(True,)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        db.engine.dispose()
+    return stats
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    profiles = (
+        ("default", getattr(Config, "SQLITE_PRAGMAS", None)),
+        ("production", ProductionConfig.SQLITE_PRAGMAS),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, pragmas in profiles:
+            stats = run_profile(Path(tmp) / f"{label}.db", pragmas, seconds, readers, writers)
+            print(
+                f"{label:<11} reads/s={stats['reads'] / seconds:8.0f}  "
+                f"writes/s={stats['writes'] / seconds:7.0f}  "
+                f"locked={stats['locked']:5d}  max_wait={stats['max_wait'] * 1000:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Process startup time for the app module, the CLI and test collection.
+
+Usage: ``python benchmarks/bench_startup.py [repeat] [top]``
+
+Each command runs ``repeat`` times (default 5) in a fresh interpreter from
+the repo root; the best and median wall times are reported. The import of
+``app`` is then re-run under ``python -X importtime`` and its self time is
+summed per top-level package, listing the ``top`` (default 12) most
+expensive ones, so a regression can be traced to the import that caused it.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+COMMANDS = {
+    "import app": ["-c", "import app"],
+    "create_app()": ["-c", "from app import create_app; create_app()"],
+    "flask --help": ["-m", "flask", "--app", "app", "--help"],
+    "pytest --collect-only": ["-m", "pytest", "-q", "--collect-only", "-p", "no:cacheprovider", "tests"],
+}
+
+
+def run(args, env):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, check=True, capture_output=True
+    )
+    return time.perf_counter() - start
+
+
+def import_profile(env):
+    """Return ``{package: self_microseconds}`` for ``import app``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    )
+    totals = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return totals
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    # Keep the configured database out of it; the point is to measure startup.
+    env = {**os.environ, "DATABASE_URL": "sqlite:///:memory:"}
+
+    print(f"{'command':<24} {'best':>9} {'median':>9}")
+    for label, args in COMMANDS.items():
+        times = [run(args, env) for _ in range(repeat)]
+        print(f"{label:<24} {min(times) * 1000:>7.0f}ms {statistics.median(times) * 1000:>7.0f}ms")
+
+    totals = import_profile(env)
+    print(f"\nimport app: {sum(totals.values()) / 1000:.0f}ms of imports, self time by package")
+    for package, self_us in totals.most_common(top):
+        print(f"  {package:<22} {self_us / 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Fixtures for the route benchmark suite.
+
+Run with ``pytest benchmarks/bench_routes.py``; ``bench_*.py`` files are not
+collected by a plain ``pytest`` run. Settings come from the environment:
+
+``BENCH_VOLUMES``
+    Comma-separated row counts to seed (default ``10000``; e.g.
+    ``10000,100000,1000000``). Each volume gets that many users and posts.
+``BENCH_ROUNDS``
+    Timed requests per route (default ``20``).
+``BENCH_TOLERANCE``
+    Allowed slowdown of p50 latency and peak memory over the baseline, as a
+    fraction (default ``0.5``). Query counts must not grow at all.
+``BENCH_SLACK_MS``
+    Extra latency allowed on top of the tolerance (default ``1.0``), so
+    scheduler jitter does not fail sub-millisecond routes.
+``BENCH_SAVE``
+    Set to ``1`` to write the results as the new baselines instead of
+    comparing against them.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from seed import seed_synthetic_data  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+VOLUMES = [int(v) for v in os.getenv("BENCH_VOLUMES", "10000").split(",") if v]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.5"))
+SLACK_MS = float(os.getenv("BENCH_SLACK_MS", "1.0"))
+SAVE = os.getenv("BENCH_SAVE") == "1"
+
+_results = {}
+
+
+def _load_baselines():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+@pytest.fixture(scope="session", params=VOLUMES, ids=lambda volume: f"{volume}rows")
+def bench_app(request, tmp_path_factory):
+    """An app over a file database seeded with ``volume`` users and posts."""
+    volume = request.param
+    path = tmp_path_factory.mktemp(f"bench{volume}") / "bench.db"
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "CACHE_BACKEND": "null",
+            "AUTO_SEED": False,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        seed_synthetic_data(volume, 1)
+        print(f"\nseeded {volume} users/posts in {time.perf_counter() - start:.1f}s")
+    app.config["BENCH_VOLUME"] = volume
+    yield app
+
+
+@pytest.fixture()
+def bench(bench_app, request):
+    """Return ``run(method, url, json=None)`` that times a route and checks baselines.
+
+    ``json`` may be a callable, so writes can send a fresh body each round.
+    """
+    client = bench_app.test_client()
+    statements = []
+    with bench_app.app_context():
+        engine = db.engine
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+
+    def run(method, url, expected_status=200, json=None):
+        key = f"{bench_app.config['BENCH_VOLUME']}:{request.node.originalname}:{method} {url}"
+
+        def call():
+            body = json() if callable(json) else json
+            return client.open(url, method=method, json=body, buffered=True)
+
+        # Warm-up, and the query count for a single request.
+        statements.clear()
+        response = call()
+        assert response.status_code == expected_status, response.get_data(as_text=True)[:200]
+        queries = len(statements)
+
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings.sort()
+        result = {
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+            "max_ms": round(timings[-1], 3),
+            "queries": queries,
+            "peak_kib": round(peak / 1024, 1),
+        }
+        _results[key] = result
+        _check_baseline(key, result)
+        return result
+
+    yield run
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def _check_baseline(key, result):
+    if SAVE:
+        return
+    baseline = _load_baselines().get(key)
+    if baseline is None:
+        return
+    problems = []
+    if result["queries"] > baseline["queries"]:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result["p50_ms"] > baseline["p50_ms"] * (1 + TOLERANCE) + SLACK_MS:
+        problems.append(f"p50 {baseline['p50_ms']}ms -> {result['p50_ms']}ms")
+    if result["peak_kib"] > baseline["peak_kib"] * (1 + TOLERANCE):
+        problems.append(f"peak memory {baseline['peak_kib']}KiB -> {result['peak_kib']}KiB")
+    if problems:
+        pytest.fail(f"{key} regressed: " + "; ".join(problems))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    width = max(len(key) for key in _results)
+    print(f"\n{'benchmark':<{width}}  {'p50 ms':>9} {'p95 ms':>9} {'queries':>7} {'peak KiB':>10}")
+    for key, result in _results.items():
+        print(
+            f"{key:<{width}}  {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['queries']:>7} {result['peak_kib']:>10.1f}"
+        )
+    if SAVE:
+        baselines = _load_baselines()
+        baselines.update(_results)
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"saved {len(_results)} baselines to {BASELINE_PATH}")
@@ -0,0 +1,226 @@
+"""Read-through cache for per-user API payloads.
+
+``GET /users/<id>`` and ``GET /users/<id>/posts`` keep their response
+payloads in a ``CacheBackend`` keyed by user id. Entries are dropped whenever
+a ``User`` or one of its ``Post`` rows is inserted, updated or deleted through
+the ORM, both at flush time and again after commit so a reader racing the
+transaction cannot leave a stale copy behind.
+
+The default backend is an in-process LRU with a TTL and a size bound. Any
+object implementing ``CacheBackend`` (for example a client for a shared cache
+server) can be supplied through ``CACHE_BACKEND``.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from metrics import register_metrics
+from replicas import primary_reads
+from models import Post, User
+
+
+class CacheBackend:
+    """Minimal key/value interface the read-through cache relies on.
+
+    Keys are strings and values JSON-serialisable objects, so networked
+    implementations can store them as-is.
+    """
+
+    def get(self, key):
+        """Return the cached value or ``None``."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store ``value`` for ``ttl`` seconds."""
+        raise NotImplementedError
+
+    def delete_many(self, keys):
+        """Remove every key in ``keys`` that is present."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every entry."""
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything; disables caching."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe in-process LRU bounded by ``max_entries`` with per-entry TTL."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+BACKENDS = {
+    "lru": lambda config: LRUCache(config["CACHE_MAX_ENTRIES"]),
+    "null": lambda config: NullCache(),
+}
+
+
+class UserCache:
+    """Read-through cache of per-user payloads with hit/miss counters."""
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def keys_for(user_id):
+        return [f"user:{user_id}", f"user:{user_id}:posts", f"user:{user_id}:etag"]
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader`` on a miss.
+
+        ``None`` results (unknown users) are not cached.
+        """
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        # Fill from the primary so a lagging replica is never cached.
+        with primary_reads():
+            value = loader()
+        if value is not None:
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate_users(self, user_ids):
+        """Drop every cached payload belonging to ``user_ids``."""
+        keys = [key for user_id in user_ids for key in self.keys_for(user_id)]
+        if keys:
+            self.invalidations += 1
+            self.backend.delete_many(keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        data = {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+        if isinstance(self.backend, LRUCache):
+            data["entries"] = len(self.backend)
+        return data
+
+
+def get_user_cache():
+    """Return the ``UserCache`` of the current app, if any."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("user_cache")
+
+
+def invalidate_users(user_ids):
+    """Invalidate ``user_ids`` in the current app's cache (used by Core writes)."""
+    cache = get_user_cache()
+    if cache is not None:
+        cache.invalidate_users(user_ids)
+
+
+def init_cache(app):
+    """Create the app's ``UserCache`` from ``CACHE_BACKEND``/``CACHE_TTL``."""
+    backend = app.config["CACHE_BACKEND"]
+    if isinstance(backend, str):
+        backend = BACKENDS[backend](app.config)
+    elif not isinstance(backend, CacheBackend):
+        backend = backend(app.config)
+
+    cache = UserCache(backend, app.config["CACHE_TTL"])
+    app.extensions["user_cache"] = cache
+    register_metrics(app, "cache", cache.snapshot)
+    return cache
+
+
+def _affected_user_ids(target):
+    if isinstance(target, User):
+        return {target.id}
+    # Post: the current author plus the previous one if user_id changed.
+    history = inspect(target).attrs.user_id.history
+    return {user_id for user_id in (*history.added, *history.deleted, target.user_id) if user_id}
+
+
+def _on_write(mapper, connection, target):
+    user_ids = _affected_user_ids(target)
+    invalidate_users(user_ids)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("cache_user_ids", set()).update(user_ids)
+
+
+def _after_commit(session):
+    user_ids = session.info.pop("cache_user_ids", None)
+    if user_ids:
+        invalidate_users(user_ids)
+
+
+def _after_rollback(session):
+    session.info.pop("cache_user_ids", None)
+
+
+for _model in (User, Post):
+    for _name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _name, _on_write)
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
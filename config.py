@@ -13,3 +13,93 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///blog.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     TESTING = False
+    # Load the sample users/posts on the first request if the database is
+    # empty. Use ``flask seed`` to seed explicitly instead.
+    AUTO_SEED = os.getenv("AUTO_SEED", "1") == "1"
+
+    # Connection pool sizing for server backends (ignored for SQLite).
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    # Read replicas for GET handlers: comma-separated URLs, each registered
+    # as a ``replica_N`` bind. See replicas.py.
+    DB_REPLICA_URLS = [url for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url]
+    DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+    DB_REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", "30"))
+    # After a write, the same client reads from the primary for this long.
+    DB_READ_YOUR_WRITES_SECONDS = int(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+    # Serve internal counters (pool usage, ...) at ``GET /metrics``.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+    # Per-request timing: Server-Timing headers, structured logs on the
+    # "instrumentation" logger and a cProfile dump of 1 in PROFILE_SAMPLE_RATE
+    # requests (0 disables profiling).
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "0") == "1"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    SLOWEST_QUERIES_KEPT = int(os.getenv("SLOWEST_QUERIES_KEPT", "3"))
+    PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+    # Read-through cache for /users/<id> payloads: "lru", "null", or a
+    # factory called with the app config that returns a cache.CacheBackend.
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "lru")
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+
+    # JSON encoder for responses: "auto" uses orjson when installed.
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # List endpoints return keyset-paginated pages of this many rows by
+    # default; clients may ask for up to ``API_MAX_PAGE_SIZE`` via ``limit``.
+    API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+    API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "1000"))
+    # Rows fetched per server-side cursor batch when streaming (``stream=``).
+    STREAM_YIELD_PER = int(os.getenv("STREAM_YIELD_PER", "1000"))
+    # Newest posts each process keeps in memory for ``GET /feed`` (0 disables
+    # the buffer; the feed then always reads the database). Edits and deletes
+    # made by other processes show up within FEED_BUFFER_TTL seconds.
+    FEED_BUFFER_SIZE = int(os.getenv("FEED_BUFFER_SIZE", "0"))
+    FEED_BUFFER_TTL = float(os.getenv("FEED_BUFFER_TTL", "30"))
+    # Rows validated and inserted per transaction by the ``/bulk`` endpoints.
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+    # Batch concurrent ``POST /posts`` inserts into one transaction, flushed
+    # after GROUP_COMMIT_MAX_DELAY_MS or GROUP_COMMIT_MAX_ROWS rows.
+    GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "0") == "1"
+    GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "2"))
+    GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", "256"))
+    GROUP_COMMIT_TIMEOUT = float(os.getenv("GROUP_COMMIT_TIMEOUT", "30"))
+
+
+class ProductionConfig(Config):
+    """Settings for a long-running server on a file-backed SQLite database."""
+
+    # Applied to every new DBAPI connection by ``database.apply_sqlite_pragmas``.
+    # WAL lets readers proceed while a writer holds the lock, NORMAL
+    # synchronous only fsyncs at checkpoints, and busy_timeout makes writers
+    # wait for the lock instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "foreign_keys": "ON",
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KIB", "65536")),
+    }
+
+
+configs = {
+    "default": Config,
+    "development": Config,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Return the config class selected by ``name`` or the ``APP_ENV`` variable."""
+    name = name or os.getenv("APP_ENV", "default")
+    try:
+        return configs[name]
+    except KeyError:
+        raise ValueError(f"Unknown APP_ENV {name!r}; expected one of {sorted(configs)}") from None
@@ -0,0 +1,179 @@
+"""Maintained per-user post counts.
+
+``users.post_count`` is kept in step with ``posts`` by database triggers on
+insert, delete and ``user_id`` updates, so ORM writes, Core bulk inserts
+(``/posts/bulk``, ``flask seed``) and raw SQL are all counted without
+application code remembering to. Reports read the column instead of
+grouping ``posts`` at request time.
+
+``flask reconcile-post-counts`` scans users in id batches and reports (or,
+with ``--fix``, repairs) rows whose stored count has drifted, e.g. after
+edits made with the triggers disabled.
+"""
+from contextlib import contextmanager
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import DDL, event, func, select, text
+
+from database import begin_transaction, db
+from models import Post, User
+
+# Duplicated in the revision that adds the column to existing databases;
+# keep the two copies in step.
+SQLITE_CREATE_STATEMENTS = [
+    "CREATE TRIGGER posts_count_ai AFTER INSERT ON posts BEGIN "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = new.user_id; "
+    "END",
+    "CREATE TRIGGER posts_count_ad AFTER DELETE ON posts BEGIN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = old.user_id; "
+    "END",
+    "CREATE TRIGGER posts_count_au AFTER UPDATE OF user_id ON posts "
+    "WHEN old.user_id IS NOT new.user_id BEGIN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = old.user_id; "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = new.user_id; "
+    "END",
+]
+
+SQLITE_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_count_au",
+    "DROP TRIGGER IF EXISTS posts_count_ad",
+    "DROP TRIGGER IF EXISTS posts_count_ai",
+]
+
+POSTGRESQL_CREATE_STATEMENTS = [
+    "CREATE OR REPLACE FUNCTION posts_count_trigger() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN RETURN NULL; END IF; "
+    "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = NEW.user_id; END IF; "
+    "IF TG_OP IN ('DELETE', 'UPDATE') THEN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = OLD.user_id; END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER posts_count AFTER INSERT OR DELETE OR UPDATE OF user_id ON posts "
+    "FOR EACH ROW EXECUTE FUNCTION posts_count_trigger()",
+]
+
+POSTGRESQL_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_count ON posts",
+    "DROP FUNCTION IF EXISTS posts_count_trigger()",
+]
+
+STATEMENTS = {
+    "sqlite": (SQLITE_CREATE_STATEMENTS, SQLITE_DROP_STATEMENTS),
+    "postgresql": (POSTGRESQL_CREATE_STATEMENTS, POSTGRESQL_DROP_STATEMENTS),
+}
+
+RECONCILE_BATCH_SIZE = 10_000
+
+# ``db.create_all()`` installs the triggers alongside posts.
+for _dialect, (_create, _drop) in STATEMENTS.items():
+    for _statement in _create:
+        event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    for _statement in _drop:
+        event.listen(Post.__table__, "before_drop", DDL(_statement).execute_if(dialect=_dialect))
+
+
+def _actual_count():
+    return select(func.count(Post.id)).where(Post.user_id == User.id).scalar_subquery()
+
+
+def recount_statement(first_id=None, last_id=None):
+    """Return an ``UPDATE`` setting ``post_count`` from ``posts`` for an id range."""
+    stmt = db.update(User).values(post_count=_actual_count())
+    if first_id is not None:
+        stmt = stmt.where(User.id >= first_id)
+    if last_id is not None:
+        stmt = stmt.where(User.id <= last_id)
+    return stmt.execution_options(synchronize_session=False)
+
+
+@contextmanager
+def deferred_counting():
+    """Skip per-row trigger updates while bulk-loading posts, then recount once.
+
+    Like ``search.deferred_indexing``: the triggers are dropped inside the
+    caller's transaction and recreated on exit, followed by a single
+    set-based recount. Rolling the transaction back also undoes the drop.
+    A no-op on dialects without triggers here.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in STATEMENTS:
+        yield
+        return
+    create, drop = STATEMENTS[dialect]
+
+    def restore():
+        for statement in create:
+            db.session.execute(text(statement))
+        db.session.execute(recount_statement())
+
+    begin_transaction()
+    for statement in drop:
+        db.session.execute(text(statement))
+    try:
+        yield
+    except BaseException:
+        # PostgreSQL refuses statements in a failed transaction; rolling it
+        # back restores the triggers there.
+        if dialect == "sqlite":
+            restore()
+        raise
+    restore()
+
+
+def find_drift(batch_size=RECONCILE_BATCH_SIZE):
+    """Yield ``(batch_end_id, drifted_rows)`` for users in id batches.
+
+    Each drifted row is ``{"id", "username", "post_count", "actual"}``.
+    """
+    actual = _actual_count().label("actual")
+    last_id = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return
+        rows = db.session.execute(
+            select(User.id, User.username, User.post_count, actual)
+            .where(User.id.between(ids[0], ids[-1]))
+            .where(User.post_count != actual)
+            .order_by(User.id)
+        )
+        last_id = ids[-1]
+        yield last_id, [row._asdict() for row in rows]
+
+
+@click.command("reconcile-post-counts")
+@click.option("--fix", is_flag=True, help="Rewrite drifted counts instead of only reporting them.")
+@click.option(
+    "--batch-size", default=RECONCILE_BATCH_SIZE, show_default=True, help="Users per batch."
+)
+@with_appcontext
+def reconcile_command(fix, batch_size):
+    """Compare users.post_count with the posts table."""
+    drifted = 0
+    for last_id, rows in find_drift(batch_size):
+        for row in rows:
+            click.echo(
+                f"user {row['id']} ({row['username']}): "
+                f"stored {row['post_count']}, actual {row['actual']}"
+            )
+        drifted += len(rows)
+        if fix and rows:
+            db.session.execute(recount_statement(rows[0]["id"], rows[-1]["id"]))
+            db.session.commit()
+        click.echo(f"checked users up to id {last_id}, {drifted} drifted", err=True)
+
+    if not drifted:
+        click.echo("All post counts match.")
+    elif fix:
+        click.echo(f"Fixed {drifted} users.")
+    else:
+        raise click.ClickException(f"{drifted} users have drifted post counts; rerun with --fix.")
@@ -1,2 +1,92 @@
+import click
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy()
\ No newline at end of file
+from sqlalchemy import event
+
+from metrics import register_metrics
+from pool import PoolMetrics, pool_options
+from replicas import RoutingSession, init_replicas
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def init_db(app):
+    """Bind ``db`` to ``app`` and apply backend-specific engine tuning.
+
+    Server backends get the ``DB_POOL_*`` pool settings; SQLite gets the
+    ``SQLITE_PRAGMAS`` connect hook. Pool activity is published to
+    ``/metrics`` under ``"pool"``. ``DB_REPLICA_URLS`` get replica engines.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if not uri.startswith("sqlite"):
+        options = pool_options(app.config)
+        options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    db.init_app(app)
+    init_replicas(app, pool_options(app.config))
+
+    with app.app_context():
+        engine = db.engine
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if pragmas and engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine, pragmas)
+
+    pool_metrics = PoolMetrics()
+    pool_metrics.attach(engine)
+    app.extensions["pool_metrics"] = pool_metrics
+    register_metrics(app, "pool", pool_metrics.snapshot)
+
+
+class LazyMigrateGroup(click.Group):
+    """``flask db`` placeholder that loads Flask-Migrate when first invoked.
+
+    Flask-Migrate imports Alembic, which takes longer than the rest of the
+    app's imports together, yet only the migration commands need it. On
+    invocation the real group replaces this one and parses the arguments.
+    """
+
+    def __init__(self, app, db):
+        super().__init__("db", help="Perform database migrations.")
+        self.app = app
+        self.db = db
+
+    def load(self):
+        from flask_migrate import Migrate
+
+        Migrate(self.app, self.db)
+        return self.app.cli.commands["db"]
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self.load().make_context(info_name, args, parent=parent, **extra)
+
+
+def init_migrate(app):
+    """Register ``flask db`` without importing Flask-Migrate up front."""
+    app.cli.add_command(LazyMigrateGroup(app, db))
+
+
+def begin_transaction():
+    """Open the session's DBAPI transaction now so that following DDL joins it.
+
+    pysqlite only begins a transaction implicitly before DML and otherwise
+    runs DDL in autocommit mode, so a ``DROP TRIGGER`` issued first would be
+    committed at once and survive a later rollback.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run ``PRAGMA name = value`` for each item on every new SQLite connection."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
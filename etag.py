@@ -0,0 +1,244 @@
+"""Strong ETags and ``If-None-Match`` handling for the read endpoints.
+
+Tags are derived from cheap watermarks rather than by hashing response
+bodies. Each table has a version, bumped by database triggers on every
+insert, delete or update of a listed column: a row in ``table_versions`` on
+SQLite, a sequence on PostgreSQL. Writes from any worker, Core statement or
+raw SQL change the tags, and reading them costs the same however large the
+tables grow. List
+endpoints are tagged with the versions of the tables they read (``/users``
+only changes with ``users``); per-user endpoints with the user's row plus the
+``posts`` version. Every tag also covers the request path and query string,
+since ``fields=`` and the endpoint change the body. A matching
+``If-None-Match`` short-circuits the view with ``304 Not Modified`` before
+any rows are loaded. On dialects without the triggers the endpoints are
+served untagged.
+
+``write_version()`` separately counts ORM commits touching users or posts in
+this process, for in-process caches such as ``feed.RecentPosts``.
+"""
+import hashlib
+import threading
+from functools import wraps
+
+from flask import Response, make_response, request
+from sqlalchemy import DDL, column, event, select, table
+from sqlalchemy.orm import Session, object_session
+
+from cache import get_user_cache
+from database import db
+from models import Post, User
+
+_version = 0
+_version_lock = threading.Lock()
+
+# SQLite: one counter row per table, bumped in the writing transaction. The
+# row lock costs nothing there, since SQLite has a single writer anyway.
+# Duplicated in the revision that adds the versions to existing databases.
+SQLITE_CREATE_STATEMENTS = [
+    "CREATE TABLE table_versions ("
+    "name VARCHAR(20) NOT NULL PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+    "INSERT INTO table_versions (name, version) VALUES ('users', 0), ('posts', 0)",
+    "CREATE TRIGGER users_version_ai AFTER INSERT ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER users_version_ad AFTER DELETE ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER users_version_au AFTER UPDATE OF username, email ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER posts_version_ai AFTER INSERT ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+    "CREATE TRIGGER posts_version_ad AFTER DELETE ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+    "CREATE TRIGGER posts_version_au AFTER UPDATE OF title, content, user_id ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+]
+
+SQLITE_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS users_version_ai",
+    "DROP TRIGGER IF EXISTS users_version_ad",
+    "DROP TRIGGER IF EXISTS users_version_au",
+    "DROP TRIGGER IF EXISTS posts_version_ai",
+    "DROP TRIGGER IF EXISTS posts_version_ad",
+    "DROP TRIGGER IF EXISTS posts_version_au",
+    "DROP TABLE IF EXISTS table_versions",
+]
+
+# PostgreSQL: a sequence per table, so concurrent writers never wait on a
+# shared row. ``nextval`` is not rolled back and is visible before commit,
+# so the bump runs from deferred triggers at commit time; a reader racing
+# the commit itself can still tag the old body until the next write.
+# ``CACHE 1`` keeps ``last_value`` in step with every bump.
+POSTGRESQL_CREATE_STATEMENTS = [
+    "CREATE SEQUENCE users_version_seq CACHE 1",
+    "CREATE SEQUENCE posts_version_seq CACHE 1",
+    "CREATE OR REPLACE FUNCTION table_version_trigger() RETURNS trigger AS $$ "
+    "BEGIN "
+    "PERFORM nextval(TG_ARGV[0]::regclass); "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE CONSTRAINT TRIGGER users_version "
+    "AFTER INSERT OR DELETE OR UPDATE OF username, email ON users "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+    "EXECUTE FUNCTION table_version_trigger('users_version_seq')",
+    "CREATE CONSTRAINT TRIGGER posts_version "
+    "AFTER INSERT OR DELETE OR UPDATE OF title, content, user_id ON posts "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+    "EXECUTE FUNCTION table_version_trigger('posts_version_seq')",
+]
+
+POSTGRESQL_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_version ON posts",
+    "DROP TRIGGER IF EXISTS users_version ON users",
+    "DROP FUNCTION IF EXISTS table_version_trigger()",
+    "DROP SEQUENCE IF EXISTS posts_version_seq",
+    "DROP SEQUENCE IF EXISTS users_version_seq",
+]
+
+STATEMENTS = {
+    "sqlite": (SQLITE_CREATE_STATEMENTS, SQLITE_DROP_STATEMENTS),
+    "postgresql": (POSTGRESQL_CREATE_STATEMENTS, POSTGRESQL_DROP_STATEMENTS),
+}
+
+# ``db.create_all()`` installs the versions once ``users`` and ``posts`` exist.
+for _dialect, (_create, _drop) in STATEMENTS.items():
+    for _statement in _create:
+        event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    for _statement in _drop:
+        event.listen(Post.__table__, "before_drop", DDL(_statement).execute_if(dialect=_dialect))
+
+table_versions = table("table_versions", column("name"), column("version"))
+
+
+def write_version():
+    """Return the number of committed ORM writes to users/posts in this process."""
+    return _version
+
+
+def make_etag(*parts):
+    """Return an opaque tag for ``parts`` (without surrounding quotes)."""
+    raw = "|".join(str(part) for part in parts).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+
+def versioned():
+    """Return whether this database keeps table versions up to date."""
+    return db.engine.dialect.name in STATEMENTS
+
+
+def _table_version(name):
+    if db.engine.dialect.name == "postgresql":
+        sequence = table(f"{name}_version_seq", column("last_value"))
+        return select(sequence.c.last_value).scalar_subquery()
+    return (
+        select(table_versions.c.version).where(table_versions.c.name == name).scalar_subquery()
+    )
+
+
+def table_version_values(*names):
+    """Return the current versions of the named tables, in order, from one statement."""
+    return tuple(db.session.execute(select(*[_table_version(name) for name in names])).one())
+
+
+def _user_watermark(user_id):
+    stmt = select(User.username, User.email, _table_version("posts")).where(User.id == user_id)
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    return make_etag(user_id, *row)
+
+
+def user_watermark(user_id):
+    """Return the watermark for one user, or ``None`` if the user is unknown.
+
+    The value is kept in the user cache next to the payloads it describes, so
+    a warm entry answers conditional requests without touching the database.
+    """
+    if not versioned():
+        return None
+    cache = get_user_cache()
+    if cache is None:
+        return _user_watermark(user_id)
+    return cache.get_or_load(f"user:{user_id}:etag", lambda: _user_watermark(user_id))
+
+
+def user_etag(user_id):
+    """Return the ETag for a per-user endpoint, varying with its path and query string."""
+    watermark = user_watermark(user_id)
+    if watermark is None:
+        return None
+    query = request.query_string.decode("latin-1")
+    return make_etag(request.path, query, watermark)
+
+
+def list_etag(*tables):
+    """Return the ETag for a list endpoint reading ``tables``, varying with its query string."""
+    if not versioned():
+        return None
+    query = request.query_string.decode("latin-1")
+    return make_etag(request.path, query, *table_version_values(*tables))
+
+
+def not_modified(tag):
+    response = Response(status=304)
+    response.set_etag(tag)
+    return response
+
+
+def conditional(compute_etag):
+    """Decorate a view so GET requests honour ``If-None-Match``.
+
+    ``compute_etag`` receives the view's keyword arguments and returns a tag,
+    or ``None`` to skip conditional handling (the view then runs normally).
+    Only ``200`` responses are tagged.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if request.method != "GET":
+                return view(**kwargs)
+            tag = compute_etag(**kwargs)
+            if tag is None:
+                return view(**kwargs)
+            if request.if_none_match.contains(tag):
+                return not_modified(tag)
+
+            response = make_response(view(**kwargs))
+            if response.status_code == 200:
+                response.set_etag(tag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _mark_dirty(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["etag_dirty"] = True
+
+
+def _after_commit(session):
+    global _version
+    if session.info.pop("etag_dirty", False):
+        with _version_lock:
+            _version += 1
+
+
+def _after_rollback(session):
+    session.info.pop("etag_dirty", None)
+
+
+for _model in (User, Post):
+    for _name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _name, _mark_dirty)
+
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,125 @@
+"""Newest-first feed of posts across all users.
+
+``GET /feed`` is answered by one statement: ``posts`` walked backwards along
+its primary key, each row joined to its author by ``users.id``, stopping
+after ``limit + 1`` rows. Its cost grows with the page size, not with the
+table. Further pages use the same opaque ``after`` cursors as the list
+endpoints, here pointing at the oldest post already returned.
+
+With ``FEED_BUFFER_SIZE`` set, each process also keeps the newest posts in a
+``RecentPosts`` buffer and serves pages that fall inside it from memory.
+Before each read the buffer is checked against ``max(posts.id)`` (an index
+lookup) and the ORM write version from ``etag``. Posts inserted by any
+writer or process are prepended with a query for just the new rows, and
+ORM edits or deletes in this process force a reload. Edits and deletes made
+by other processes are picked up within ``FEED_BUFFER_TTL`` seconds, as with
+the user cache.
+"""
+import time
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from database import db
+from etag import write_version
+from metrics import register_metrics
+from models import Post, User
+from pagination import finish_page
+from projection import POST_FIELDS, columns
+from serialization import rows_to_dicts
+
+
+def feed_statement(limit, after_id=None, names=tuple(POST_FIELDS)):
+    """Return the newest ``limit + 1`` posts older than ``after_id``, newest first."""
+    stmt = select(*columns(POST_FIELDS, names)).select_from(Post)
+    if "username" in names:
+        stmt = stmt.outerjoin(User, Post.user_id == User.id)
+    if after_id is not None:
+        stmt = stmt.where(Post.id < after_id)
+    return stmt.order_by(Post.id.desc()).limit(limit + 1)
+
+
+class RecentPosts:
+    """Per-process buffer of the newest ``size`` posts, newest first.
+
+    The rows, the ``(max_id, write_version)`` tag they were read at and the
+    load time are swapped as one tuple, so concurrent requests never see a
+    half-updated buffer; at worst two of them refresh it at once.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._state = (None, float("-inf"), ())
+        self.hits = 0
+        self.top_ups = 0
+        self.reloads = 0
+
+    def _fetch(self, newer_than=None):
+        stmt = feed_statement(self.size - 1)
+        if newer_than is not None:
+            stmt = stmt.where(Post.id > newer_than)
+        return tuple(rows_to_dicts(db.session.execute(stmt)))
+
+    def rows(self):
+        """Return the buffered rows, bringing them up to date first."""
+        tag = (db.session.execute(select(func.max(Post.id))).scalar(), write_version())
+        current, loaded_at, rows = self._state
+        now = time.monotonic()
+
+        fresh = now - loaded_at < self.ttl
+        if fresh and current == tag:
+            self.hits += 1
+            return rows
+        if fresh and current[1] == tag[1] and (current[0] or 0) < (tag[0] or 0):
+            # Only posts inserted since the last read: fetch just those.
+            rows = (self._fetch(newer_than=current[0] or 0) + rows)[: self.size]
+            self.top_ups += 1
+        else:
+            rows = self._fetch()
+            loaded_at = now
+            self.reloads += 1
+        self._state = (tag, loaded_at, rows)
+        return rows
+
+    def page(self, limit, after_id=None):
+        """Return ``limit + 1`` rows older than ``after_id``, or ``None`` if not buffered."""
+        buffered = self.rows()
+        rows = buffered
+        if after_id is not None:
+            rows = [row for row in rows if row["id"] < after_id]
+        # A short buffer holds every post, so a short answer is still complete.
+        if len(rows) > limit or len(buffered) < self.size:
+            return rows[: limit + 1]
+        return None
+
+    def snapshot(self):
+        return {
+            "size": self.size,
+            "buffered": len(self._state[2]),
+            "hits": self.hits,
+            "top_ups": self.top_ups,
+            "reloads": self.reloads,
+        }
+
+
+def feed_page(limit, after_id=None, names=tuple(POST_FIELDS)):
+    """Return ``(rows, next_cursor)`` for one page of the feed."""
+    recent = current_app.extensions.get("recent_posts")
+    rows = recent.page(limit, after_id) if recent is not None else None
+    if rows is None:
+        rows = rows_to_dicts(db.session.execute(feed_statement(limit, after_id, names)))
+    elif len(names) < len(POST_FIELDS):
+        rows = [{name: row[name] for name in names} for row in rows]
+    return finish_page(rows, Post.id, limit)
+
+
+def init_feed(app):
+    """Create the app's ``RecentPosts`` buffer if ``FEED_BUFFER_SIZE`` is set."""
+    size = app.config.get("FEED_BUFFER_SIZE")
+    if not size:
+        return None
+    recent = RecentPosts(size, app.config["FEED_BUFFER_TTL"])
+    app.extensions["recent_posts"] = recent
+    register_metrics(app, "feed", recent.snapshot)
+    return recent
@@ -0,0 +1,156 @@
+"""Opt-in group commit for ``POST /posts``.
+
+Each post creation normally commits on its own, and on SQLite every commit
+takes the database write lock (and, with ``synchronous=FULL``, an fsync), so
+concurrent writers queue up behind each other. With
+``GROUP_COMMIT_ENABLED`` the view hands its row to a ``GroupCommitter``
+instead: a background thread collects the rows queued within
+``GROUP_COMMIT_MAX_DELAY_MS`` (or until ``GROUP_COMMIT_MAX_ROWS``) and
+inserts them in one transaction. The delay only applies while the previous
+batch held more than one row, so an uncontended writer is not slowed down.
+Each request waits on its own future and receives its own generated id, or
+its own error, only after the commit.
+
+If the batched transaction fails with an integrity error, its rows are
+retried one transaction each so a single bad row only fails its own
+request. Batching only happens between threads of one process, so it needs
+a threaded server (e.g. ``gunicorn --threads``).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from cache import get_user_cache
+from database import db
+from metrics import register_metrics
+from models import Post
+
+_STOP = object()
+
+
+class GroupCommitter:
+    """Background thread batching ``posts`` inserts into shared transactions."""
+
+    def __init__(self, engine, max_delay_ms, max_rows, cache=None):
+        self.engine = engine
+        self.max_delay = max_delay_ms / 1000
+        self.max_rows = max_rows
+        self.cache = cache
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._insert = insert(Post.__table__).returning(Post.__table__.c.id)
+
+    def submit(self, row):
+        """Queue ``row`` (a dict of ``posts`` columns); return a ``Future`` of its id."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _ensure_started(self):
+        # Started lazily so each forked worker process gets its own thread.
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="group-commit", daemon=True
+                    )
+                    self._thread.start()
+
+    def close(self):
+        """Flush queued rows and stop the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _collect(self, first, wait):
+        batch, stop = [first], False
+        deadline = time.monotonic() + (self.max_delay if wait else 0)
+        while len(batch) < self.max_rows:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        previous = 1
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            # Only hold the batch open while writes are arriving concurrently;
+            # a lone writer is flushed at once instead of paying the delay.
+            batch, stop = self._collect(item, wait=previous > 1)
+            previous = len(batch)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _insert_rows(self, batch):
+        with self.engine.begin() as connection:
+            return [connection.execute(self._insert, row).scalar_one() for row, _ in batch]
+
+    def _flush(self, batch):
+        try:
+            outcomes = list(zip(batch, self._insert_rows(batch)))
+        except IntegrityError:
+            outcomes = []
+            for item in batch:
+                try:
+                    outcomes.append((item, self._insert_rows([item])[0]))
+                except Exception as exc:  # handed to the waiting request
+                    outcomes.append((item, exc))
+        except Exception as exc:
+            outcomes = [(item, exc) for item in batch]
+
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        if self.cache is not None:
+            # Core inserts bypass the ORM events that normally invalidate.
+            self.cache.invalidate_users({row["user_id"] for row, _ in batch})
+        for (_, future), outcome in outcomes:
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "queued": self._queue.qsize(),
+        }
+
+
+def init_group_commit(app):
+    """Create the app's ``GroupCommitter`` if ``GROUP_COMMIT_ENABLED`` is set."""
+    if not app.config.get("GROUP_COMMIT_ENABLED"):
+        return None
+    with app.app_context():
+        engine = db.engine
+        cache = get_user_cache()
+    committer = GroupCommitter(
+        engine,
+        app.config["GROUP_COMMIT_MAX_DELAY_MS"],
+        app.config["GROUP_COMMIT_MAX_ROWS"],
+        cache,
+    )
+    app.extensions["group_commit"] = committer
+    register_metrics(app, "group_commit", committer.snapshot)
+    return committer
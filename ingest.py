@@ -0,0 +1,177 @@
+"""Bulk ingestion of users and posts.
+
+Records arrive as a JSON array or an NDJSON stream and are processed in
+chunks: each chunk is validated together (one ``IN`` query per chunk for
+uniqueness or foreign-key checks), inserted with a single executemany
+``INSERT ... RETURNING`` and committed as one transaction. Invalid rows are
+reported by their position in the input and never abort the rest of the
+import.
+"""
+import json
+from itertools import islice
+
+from flask import request
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from cache import invalidate_users
+from database import db
+from models import Post, User
+
+
+class BulkError(ValueError):
+    """Raised when a bulk request body cannot be read at all."""
+
+
+def read_records():
+    """Yield ``(index, record, error)`` for each item in the request body.
+
+    ``application/x-ndjson`` bodies are read line by line from the request
+    stream; anything else must be a JSON array.
+    """
+    if request.mimetype == "application/x-ndjson":
+        return _ndjson_records(request.stream)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise BulkError("Request body must be a JSON array or NDJSON stream")
+    return ((index, record, None) for index, record in enumerate(data))
+
+
+def _ndjson_records(stream):
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line), None
+        except ValueError:
+            yield index, None, "Invalid JSON"
+        index += 1
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _parse(chunk, fields, errors):
+    """Split a chunk into well-formed ``(index, record)`` pairs, logging the rest.
+
+    ``fields`` maps each accepted key to ``(type, required)``.
+    """
+    parsed = []
+    for index, record, error in chunk:
+        if error is None and not isinstance(record, dict):
+            error = "Each record must be a JSON object"
+        if error is None:
+            error = _field_error(record, fields)
+        if error is not None:
+            errors.append({"index": index, "message": error})
+        else:
+            parsed.append((index, record))
+    return parsed
+
+
+def _field_error(record, fields):
+    missing = [name for name, (_, required) in fields.items() if required and not record.get(name)]
+    if missing:
+        return f"{', '.join(missing)} required"
+    for name, (type_, _) in fields.items():
+        value = record.get(name)
+        if value is not None and (not isinstance(value, type_) or isinstance(value, bool)):
+            return f"{name} must be of type {type_.__name__}"
+    return None
+
+
+def _validate_users(chunk, errors, seen):
+    parsed = _parse(chunk, {"username": (str, True), "email": (str, False)}, errors)
+    if not parsed:
+        return []
+    usernames = {record["username"] for _, record in parsed}
+    emails = {record["email"] for _, record in parsed if record.get("email")}
+    taken = set(
+        db.session.execute(
+            select(User.username, User.email).where(
+                User.username.in_(usernames) | User.email.in_(emails)
+            )
+        ).all()
+    )
+    taken_usernames = {username for username, _ in taken}
+    taken_emails = {email for _, email in taken if email}
+
+    rows = []
+    for index, record in parsed:
+        username, email = record["username"], record.get("email")
+        if username in taken_usernames or ("username", username) in seen:
+            errors.append({"index": index, "message": "Username already exists"})
+        elif email and (email in taken_emails or ("email", email) in seen):
+            errors.append({"index": index, "message": "Email already exists"})
+        else:
+            seen.add(("username", username))
+            if email:
+                seen.add(("email", email))
+            rows.append((index, {"username": username, "email": email}))
+    return rows
+
+
+def _validate_posts(chunk, errors, seen):
+    parsed = _parse(
+        chunk, {"title": (str, True), "content": (str, True), "user_id": (int, True)}, errors
+    )
+    if not parsed:
+        return []
+    user_ids = {record["user_id"] for _, record in parsed}
+    existing = set(db.session.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+
+    rows = []
+    for index, record in parsed:
+        if record["user_id"] not in existing:
+            errors.append({"index": index, "message": "User not found"})
+        else:
+            row = {name: record[name] for name in ("title", "content", "user_id")}
+            rows.append((index, row))
+    return rows
+
+
+def _ingest(records, model, validate, chunk_size):
+    result = {"inserted": 0, "ids": [], "errors": []}
+    seen = set()
+    # Without ``sort_by_parameter_order`` the rows are sent as one multi-row
+    # INSERT per page instead of one statement each (SQLite cannot promise
+    # RETURNING order). Ids are handed out in VALUES order, from SQLite's
+    # rowid or a PostgreSQL sequence, so sorting them restores input order.
+    stmt = insert(model).returning(model.id)
+
+    for chunk in _chunks(records, chunk_size):
+        rows = validate(chunk, result["errors"], seen)
+        if not rows:
+            continue
+        try:
+            ids = sorted(db.session.execute(stmt, [row for _, row in rows]).scalars())
+            db.session.commit()
+        except IntegrityError as exc:
+            db.session.rollback()
+            message = f"Integrity error: {exc.orig}"
+            result["errors"].extend({"index": index, "message": message} for index, _ in rows)
+            continue
+        if model is Post:
+            # Core inserts bypass the ORM events that normally invalidate.
+            invalidate_users({row["user_id"] for _, row in rows})
+        result["inserted"] += len(ids)
+        result["ids"].extend(ids)
+
+    result["errors"].sort(key=lambda error: error["index"])
+    return result
+
+
+def ingest_users(records, chunk_size):
+    """Insert users from ``records`` in chunks of ``chunk_size``."""
+    return _ingest(records, User, _validate_users, chunk_size)
+
+
+def ingest_posts(records, chunk_size):
+    """Insert posts from ``records`` in chunks of ``chunk_size``."""
+    return _ingest(records, Post, _validate_posts, chunk_size)
@@ -0,0 +1,139 @@
+"""Opt-in per-request timing, SQL accounting and sampled profiling.
+
+With ``INSTRUMENTATION_ENABLED`` set, every request records its wall time,
+the number of SQL statements it ran, their total time and the slowest few
+(via ``before_cursor_execute``/``after_cursor_execute``). The numbers are
+returned in a ``Server-Timing`` header and logged as one structured record
+on the ``instrumentation`` logger; statements slower than ``SLOW_QUERY_MS``
+are also logged individually. With ``PROFILE_SAMPLE_RATE`` set to N, one
+request in N runs under cProfile and its stats are written to
+``PROFILE_DIR``.
+"""
+import cProfile
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from database import db
+
+logger = logging.getLogger("instrumentation")
+
+
+class RequestStats:
+    """SQL counters for one request."""
+
+    def __init__(self, keep):
+        self.start = time.perf_counter()
+        self.keep = keep
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest = []  # min-heap of (seconds, seq, statement)
+        self._seq = itertools.count()
+        self.profiler = None
+
+    def record(self, statement, seconds):
+        self.queries += 1
+        self.sql_time += seconds
+        item = (seconds, next(self._seq), statement)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, item)
+        else:
+            heapq.heappushpop(self.slowest, item)
+
+    def slowest_statements(self):
+        return [
+            {"ms": round(seconds * 1000, 3), "statement": " ".join(statement.split())}
+            for seconds, _, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+def _current_stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentation_start = time.perf_counter()
+
+
+def _make_after_cursor_execute(slow_query_ms):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._instrumentation_start
+        stats = _current_stats()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if seconds * 1000 >= slow_query_ms:
+            logger.warning("slow query %.1fms: %s", seconds * 1000, " ".join(statement.split()))
+
+    return after_cursor_execute
+
+
+def _profile_path(directory):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", request.path).strip("_") or "root"
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns()}"
+    return os.path.join(directory, f"{stamp}-{os.getpid()}-{request.method}-{slug}.prof")
+
+
+def init_instrumentation(app):
+    """Install the request hooks and SQL listeners if ``INSTRUMENTATION_ENABLED``."""
+    if not app.config.get("INSTRUMENTATION_ENABLED"):
+        return
+
+    keep = app.config["SLOWEST_QUERIES_KEPT"]
+    sample_rate = app.config["PROFILE_SAMPLE_RATE"]
+    profile_dir = app.config["PROFILE_DIR"]
+    counter = itertools.count(1)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    after_cursor_execute = _make_after_cursor_execute(app.config["SLOW_QUERY_MS"])
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    @app.before_request
+    def start_request_stats():
+        stats = g.request_stats = RequestStats(keep)
+        if sample_rate and next(counter) % sample_rate == 0:
+            stats.profiler = cProfile.Profile()
+            stats.profiler.enable()
+
+    @app.after_request
+    def finish_request_stats(response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.start) * 1000
+        sql_ms = stats.sql_time * 1000
+
+        if stats.profiler is not None:
+            stats.profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            stats.profiler.dump_stats(_profile_path(profile_dir))
+
+        response.headers.add(
+            "Server-Timing",
+            f'app;dur={total_ms:.2f}, db;dur={sql_ms:.2f};desc="{stats.queries} queries"',
+        )
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round(total_ms, 3),
+                    "sql_queries": stats.queries,
+                    "sql_ms": round(sql_ms, 3),
+                    "slowest": stats.slowest_statements(),
+                    "profiled": stats.profiler is not None,
+                }
+            )
+        )
+        return response
@@ -0,0 +1,211 @@
+"""Parallel integrity check over ``users`` and ``posts``.
+
+``flask integrity-check`` splits both tables into primary-key ranges of
+``--chunk-size`` ids and checks the ranges in a pool of worker processes,
+each reading through its own read-only connection:
+
+* orphaned posts: ``posts.user_id`` naming a user that does not exist;
+* NULLs in ``NOT NULL`` columns, e.g. left behind by a migration that ran
+  with constraints off;
+* duplicate values in unique ``users`` columns (``email``, ``username``),
+  one streamed ``GROUP BY`` per column.
+
+Problems are printed as chunks complete, up to ``--samples`` examples per
+check, with progress on stderr. Only a bounded number of chunks is in flight
+and each worker streams its rows, so memory use does not depend on table
+size. The command exits non-zero if anything was found.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, func, inspect, or_, select
+from sqlalchemy.pool import NullPool
+
+from database import db
+from models import Post, User
+
+CHUNK_SIZE = 50_000
+SAMPLE_SIZE = 20
+TABLES = (Post.__table__, User.__table__)
+
+_engine = None  # one per worker process
+
+
+def readonly_engine(url):
+    """Return an engine for ``url`` whose connections cannot write."""
+    if url.get_backend_name() == "sqlite":
+        url = url.set(database=f"file:{url.database}", query={"mode": "ro", "uri": "true"})
+        return create_engine(url, poolclass=NullPool)
+    options = {}
+    if url.get_backend_name() == "postgresql":
+        options["execution_options"] = {"postgresql_readonly": True}
+    return create_engine(url, poolclass=NullPool, **options)
+
+
+def _init_worker(url):
+    global _engine
+    _engine = readonly_engine(url)
+
+
+def _collect(rows, describe, sample_size):
+    count, samples = 0, []
+    for row in rows:
+        count += 1
+        if len(samples) < sample_size:
+            samples.append(describe(row))
+    return count, samples
+
+
+def _in_range(table, first_id, last_id):
+    return (table.c.id >= first_id, table.c.id <= last_id)
+
+
+def _null_violations(connection, table, first_id, last_id, names, sample_size):
+    columns = [table.c[name] for name in names]
+    stmt = select(table.c.id, *[column.is_(None).label(column.name) for column in columns]).where(
+        *_in_range(table, first_id, last_id), or_(*[column.is_(None) for column in columns])
+    )
+
+    def describe(row):
+        missing = [column.name for column in columns if row._mapping[column.name]]
+        return f"{table.name} {row.id}: NULL {', '.join(missing)}"
+
+    return _collect(connection.execute(stmt), describe, sample_size)
+
+
+def _orphaned_posts(connection, first_id, last_id, sample_size):
+    stmt = (
+        select(Post.id, Post.user_id)
+        .outerjoin(User, Post.user_id == User.id)
+        .where(*_in_range(Post.__table__, first_id, last_id))
+        .where(Post.user_id.is_not(None), User.id.is_(None))
+    )
+    return _collect(
+        connection.execute(stmt),
+        lambda row: f"post {row.id}: user {row.user_id} does not exist",
+        sample_size,
+    )
+
+
+def _duplicates(connection, column_name, sample_size):
+    column = User.__table__.c[column_name]
+    stmt = (
+        select(column, func.count(), func.min(User.id))
+        .where(column.is_not(None))
+        .group_by(column)
+        .having(func.count() > 1)
+    )
+    return _collect(
+        connection.execute(stmt),
+        lambda row: f"{row[0]!r} in {row[1]} rows, first is user {row[2]}",
+        sample_size,
+    )
+
+
+def check_task(task, sample_size=SAMPLE_SIZE):
+    """Run one task in a worker and return ``{check: (count, samples)}``.
+
+    ``task`` is ``("range", table_name, first_id, last_id, not_null_columns)``
+    or ``("duplicates", column_name)``.
+    """
+    with _engine.connect() as connection:
+        if task[0] == "duplicates":
+            return {f"duplicate users.{task[1]}": _duplicates(connection, task[1], sample_size)}
+        _, name, first_id, last_id, names = task
+        table = next(table for table in TABLES if table.name == name)
+        results = {}
+        if names:
+            results[f"NULL in {name}"] = _null_violations(
+                connection, table, first_id, last_id, names, sample_size
+            )
+        if table is Post.__table__:
+            results["orphaned posts"] = _orphaned_posts(connection, first_id, last_id, sample_size)
+        return results
+
+
+def plan_tasks(connection, chunk_size):
+    """Yield every task: unique-column scans first, then id ranges of each table.
+
+    Only tables and columns present in the database are checked, so
+    databases that have not had every migration applied can still be checked.
+    """
+    inspector = inspect(connection)
+    present = {
+        table.name: {column["name"] for column in inspector.get_columns(table.name)}
+        for table in TABLES
+        if inspector.has_table(table.name)
+    }
+    for column in User.__table__.columns:
+        if column.unique and column.name in present.get("users", ()):
+            yield ("duplicates", column.name)
+    for table in TABLES:
+        if table.name not in present:
+            continue
+        not_null = tuple(
+            column.name
+            for column in table.columns
+            if not column.nullable and not column.primary_key and column.name in present[table.name]
+        )
+        low, high = connection.execute(select(func.min(table.c.id), func.max(table.c.id))).one()
+        if low is None:
+            continue
+        for first_id in range(low, high + 1, chunk_size):
+            yield ("range", table.name, first_id, min(first_id + chunk_size - 1, high), not_null)
+
+
+def run_checks(url, tasks, workers, sample_size=SAMPLE_SIZE):
+    """Run ``tasks`` across ``workers`` processes; yield ``(task, results)`` as they finish.
+
+    At most twice as many tasks as workers are queued at once.
+    """
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(url,)) as pool:
+        pending = {}
+        while True:
+            for task in tasks:
+                pending[pool.submit(check_task, task, sample_size)] = task
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+@click.command("integrity-check")
+@click.option(
+    "--workers", default=os.cpu_count() or 1, show_default="CPU count", help="Worker processes."
+)
+@click.option("--chunk-size", default=CHUNK_SIZE, show_default=True, help="Ids per chunk.")
+@click.option(
+    "--samples", default=SAMPLE_SIZE, show_default=True, help="Problems printed per check."
+)
+@with_appcontext
+def integrity_command(workers, chunk_size, samples):
+    """Check posts and users for orphans, duplicates and NULLs in parallel."""
+    url = db.engine.url
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        raise click.ClickException("An in-memory database cannot be shared with worker processes.")
+    with db.engine.connect() as connection:
+        tasks = list(plan_tasks(connection, chunk_size))
+
+    totals, printed = {}, {}
+    for done, (task, results) in enumerate(run_checks(url, tasks, workers, samples), start=1):
+        for check, (count, examples) in results.items():
+            totals[check] = totals.get(check, 0) + count
+            for example in examples[: samples - printed.get(check, 0)]:
+                click.echo(f"{check}: {example}")
+            printed[check] = min(samples, printed.get(check, 0) + len(examples))
+        where = f"{task[1]} ids {task[2]}-{task[3]}" if task[0] == "range" else f"users.{task[1]}"
+        click.echo(f"[{done}/{len(tasks)}] checked {where}", err=True)
+
+    problems = {check: count for check, count in totals.items() if count}
+    for check, count in sorted(problems.items()):
+        click.echo(f"{check}: {count} total")
+    if not problems:
+        click.echo("No integrity problems found.")
+        return
+    raise click.ClickException(f"{sum(problems.values())} integrity problems found.")
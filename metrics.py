@@ -0,0 +1,24 @@
+"""Internal ``/metrics`` endpoint.
+
+Subsystems register a named provider returning a JSON-serialisable dict;
+``GET /metrics`` reports every provider for the current process. The route
+is only installed when ``METRICS_ENABLED`` is set.
+"""
+from flask import current_app, jsonify
+
+
+def register_metrics(app, name, provider):
+    """Expose ``provider()`` under ``name`` in ``/metrics`` for ``app``."""
+    app.extensions.setdefault("metrics", {})[name] = provider
+
+
+def metrics_view():
+    """Report every registered metrics provider."""
+    providers = current_app.extensions.get("metrics", {})
+    return jsonify({name: provider() for name, provider in providers.items()}), 200
+
+
+def init_metrics(app):
+    """Install ``GET /metrics`` if ``METRICS_ENABLED`` is set."""
+    if app.config.get("METRICS_ENABLED"):
+        app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
@@ -0,0 +1,323 @@
+"""Online copy-and-swap table rebuilds for SQLite.
+
+``op.batch_alter_table`` rebuilds a table by copying every row inside one
+transaction, holding the write lock for as long as the copy takes. On a
+multi-GB ``posts`` table that is an outage. ``copy_and_swap`` performs the
+same rebuild in the background of normal traffic:
+
+1. Create a shadow table with the new schema (no secondary indexes yet) and
+   triggers on the source table that mirror every insert, update and delete
+   into it.
+2. Copy rows across in primary-key chunks, each in its own short
+   transaction together with a checkpoint in ``_copy_and_swap``, sleeping
+   between chunks to leave room for application writes.
+3. In one short transaction: rename the source table aside and the shadow
+   into its place, create the new table's indexes, recreate the triggers
+   the source table had (e.g. the FTS and ``post_count`` triggers) and
+   check foreign keys.
+4. Delete the old table's rows in throttled chunks, then drop it.
+
+If the process is interrupted, running the migration again resumes from the
+checkpoint: after the last committed chunk (the mirroring triggers kept the
+shadow current in the meantime), or at the cleanup. Index builds happen in
+step 3, so the swap holds the write lock for roughly one sorted pass over
+the table rather than the whole copy.
+
+Usage from a revision (the connection must be in autocommit mode, since the
+helper issues its own ``BEGIN``/``COMMIT`` per chunk)::
+
+    from migrations.online import copy_and_swap
+
+    def upgrade():
+        posts = sa.Table('posts', sa.MetaData(), ...new columns..., sa.Index(...))
+        with op.get_context().autocommit_block():
+            copy_and_swap(op.get_bind(), posts, name=revision,
+                          expressions={'summary': "substr({row}.content, 1, 200)"})
+"""
+import time
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+
+STATE_TABLE = "_copy_and_swap"
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def print_progress(state):
+    """Default progress callback: one line per chunk on stdout."""
+    eta = f", eta {state['eta']:.0f}s" if state["eta"] is not None else ""
+    print(
+        f"{state['name']}: {state['table']} key {state['last_key']}/{state['max_key']} "
+        f"({state['percent']:.1f}%), {state['copied']} rows, {state['rate']:.0f} rows/s{eta}"
+    )
+
+
+class CopyAndSwap:
+    """One resumable rebuild of ``table.name`` into the schema of ``table``.
+
+    ``expressions`` maps a new column name to a SQL expression over the
+    source row, written with a ``{row}`` placeholder for the row alias
+    (``"lower({row}.title)"``). Columns without an expression are copied
+    from the source column of the same name; new columns missing from the
+    source must have an expression or a server default.
+    """
+
+    def __init__(
+        self,
+        connection,
+        table,
+        name,
+        expressions=None,
+        key="id",
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        pause=0.0,
+        max_rows_per_second=None,
+        after_swap=(),
+        check_foreign_keys=True,
+        progress=print_progress,
+    ):
+        if connection.dialect.name != "sqlite":
+            raise NotImplementedError("copy_and_swap only supports SQLite")
+        self.connection = connection
+        self.table = table
+        self.name = name
+        self.key = key
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.max_rows_per_second = max_rows_per_second
+        self.after_swap = list(after_swap)
+        self.check_foreign_keys = check_foreign_keys
+        self.progress = progress
+
+        self.source = table.name
+        self.shadow = f"_{self.source}_new"
+        self.old = f"_{self.source}_old"
+        source_columns = {
+            row[1] for row in self._execute(f"PRAGMA table_info({self._q(self.source)})")
+        }
+        expressions = dict(expressions or {})
+        self.columns = []
+        self.expressions = []
+        for column in table.columns:
+            if column.name in expressions:
+                expression = expressions[column.name]
+            elif column.name in source_columns:
+                expression = "{row}." + self._q(column.name)
+            else:
+                continue  # filled by the column's server default
+            self.columns.append(self._q(column.name))
+            self.expressions.append(expression)
+
+    def _execute(self, sql, params=None):
+        return self.connection.exec_driver_sql(sql, params or ())
+
+    def _q(self, name):
+        return _quote(self.connection, name)
+
+    @contextmanager
+    def _transaction(self):
+        self._execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._execute("ROLLBACK")
+            raise
+        self._execute("COMMIT")
+
+    def _select(self, row):
+        return ", ".join(expression.format(row=row) for expression in self.expressions)
+
+    def _sync_trigger_names(self):
+        return [f"{self.shadow}_sync_{suffix}" for suffix in ("ai", "au", "ad")]
+
+    def _sync_triggers(self):
+        source, shadow, key = self._q(self.source), self._q(self.shadow), self._q(self.key)
+        insert, update, delete = map(self._q, self._sync_trigger_names())
+        upsert = (
+            f"INSERT OR REPLACE INTO {shadow} ({', '.join(self.columns)}) "
+            f"SELECT {self._select('new')};"
+        )
+        return [
+            f"CREATE TRIGGER {insert} AFTER INSERT ON {source} BEGIN {upsert} END",
+            f"CREATE TRIGGER {update} AFTER UPDATE ON {source} BEGIN "
+            f"DELETE FROM {shadow} WHERE {key} = old.{key}; {upsert} END",
+            f"CREATE TRIGGER {delete} AFTER DELETE ON {source} BEGIN "
+            f"DELETE FROM {shadow} WHERE {key} = old.{key}; END",
+        ]
+
+    def _shadow_table(self):
+        metadata = sa.MetaData()
+        # Stub referenced tables so foreign keys compile without reflection.
+        for fk in self.table.foreign_keys:
+            target, column = fk.target_fullname.rsplit(".", 1)
+            if target not in metadata.tables:
+                sa.Table(target, metadata, sa.Column(column, sa.Integer, primary_key=True))
+        shadow = self.table.to_metadata(metadata, name=self.shadow)
+        shadow.indexes.clear()
+        return shadow
+
+    def _state(self):
+        return self._execute(
+            f"SELECT last_key, copied, phase FROM {STATE_TABLE} WHERE name = ?", (self.name,)
+        ).first()
+
+    def prepare(self):
+        """Create the state row, shadow table and mirroring triggers if missing."""
+        self._execute(
+            f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+            "name TEXT PRIMARY KEY, source TEXT NOT NULL, phase TEXT NOT NULL, "
+            "last_key INTEGER NOT NULL, copied INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        if self._state() is not None:
+            return  # resuming; the shadow and its triggers already exist
+
+        create = sa.schema.CreateTable(self._shadow_table()).compile(dialect=self.connection.dialect)
+        min_key = self._execute(
+            f"SELECT min({self._q(self.key)}) FROM {self._q(self.source)}"
+        ).scalar()
+        with self._transaction():
+            self._execute(f"DROP TABLE IF EXISTS {self._q(self.shadow)}")
+            self._execute(str(create))
+            for sql in self._sync_triggers():
+                self._execute(sql)
+            self._execute(
+                f"INSERT INTO {STATE_TABLE} (name, source, phase, last_key, copied, updated_at) "
+                "VALUES (?, ?, 'copying', ?, 0, ?)",
+                (self.name, self.source, (min_key or 1) - 1, time.time()),
+            )
+
+    def copy(self):
+        """Copy the remaining chunks, checkpointing after each one."""
+        source, key = self._q(self.source), self._q(self.key)
+        # Rows inserted after this read are mirrored by the triggers.
+        max_key = self._execute(f"SELECT max({key}) FROM {source}").scalar() or 0
+        last_key, copied, _ = self._state()
+        # OR IGNORE: a row the triggers already mirrored is at least as new.
+        copy_sql = (
+            f"INSERT OR IGNORE INTO {self._q(self.shadow)} ({', '.join(self.columns)}) "
+            f"SELECT {self._select(source)} FROM {source} "
+            f"WHERE {source}.{key} > ? AND {source}.{key} <= ?"
+        )
+        started, first_key, first_copied = time.monotonic(), last_key, copied
+
+        while last_key < max_key:
+            chunk_started = time.monotonic()
+            high = min(last_key + self.chunk_size, max_key)
+            with self._transaction():
+                rows = self._execute(copy_sql, (last_key, high)).rowcount
+                self._execute(
+                    f"UPDATE {STATE_TABLE} SET last_key = ?, copied = copied + ?, updated_at = ? "
+                    "WHERE name = ?",
+                    (high, rows, time.time(), self.name),
+                )
+            last_key, copied = high, copied + rows
+
+            if self.progress:
+                elapsed = max(time.monotonic() - started, 1e-9)
+                key_rate = (last_key - first_key) / elapsed
+                self.progress(
+                    {
+                        "name": self.name,
+                        "table": self.source,
+                        "last_key": last_key,
+                        "max_key": max_key,
+                        "percent": 100.0 * last_key / max_key,
+                        "copied": copied,
+                        "rate": (copied - first_copied) / elapsed,
+                        "eta": (max_key - last_key) / key_rate if key_rate else None,
+                    }
+                )
+            self._throttle(chunk_started, rows)
+
+    def _throttle(self, chunk_started, rows):
+        delay = self.pause
+        if self.max_rows_per_second:
+            delay = max(delay, rows / self.max_rows_per_second - (time.monotonic() - chunk_started))
+        if delay > 0:
+            time.sleep(delay)
+
+    def swap(self):
+        """Put the shadow in the source table's place in one short transaction.
+
+        The old table is renamed aside rather than dropped here; freeing its
+        pages is left to ``cleanup`` so the write lock is held only for the
+        index builds.
+        """
+        sync = set(self._sync_trigger_names())
+        indexes = [
+            str(sa.schema.CreateIndex(index).compile(dialect=self.connection.dialect))
+            for index in self.table.indexes
+        ]
+        source, shadow, old = self._q(self.source), self._q(self.shadow), self._q(self.old)
+
+        foreign_keys = self._execute("PRAGMA foreign_keys").scalar()
+        # Keep other tables' foreign keys pointing at the name, not the old table.
+        self._execute("PRAGMA foreign_keys = OFF")
+        self._execute("PRAGMA legacy_alter_table = ON")
+        try:
+            with self._transaction():
+                expected = self._execute(f"SELECT count(*) FROM {source}").scalar()
+                actual = self._execute(f"SELECT count(*) FROM {shadow}").scalar()
+                if expected != actual:
+                    raise RuntimeError(
+                        f"{self.shadow} has {actual} rows, {self.source} has {expected}; "
+                        "a new constraint may have rejected rows"
+                    )
+                attached = self._execute(
+                    "SELECT type, name, sql FROM sqlite_master "
+                    "WHERE type IN ('trigger', 'index') AND tbl_name = ? AND sql IS NOT NULL",
+                    (self.source,),
+                ).all()
+                # Names are schema-wide, so the old table's must go first.
+                for kind, name, _ in attached:
+                    self._execute(f"DROP {kind.upper()} {self._q(name)}")
+                self._execute(f"ALTER TABLE {source} RENAME TO {old}")
+                self._execute(f"ALTER TABLE {shadow} RENAME TO {source}")
+                triggers = [sql for kind, name, sql in attached if kind == "trigger" and name not in sync]
+                for sql in indexes + triggers + self.after_swap:
+                    self._execute(sql)
+                if self.check_foreign_keys:
+                    violations = self._execute(f"PRAGMA foreign_key_check({source})").all()
+                    if violations:
+                        raise RuntimeError(f"foreign key violations after swap: {violations[:5]}")
+                self._execute(
+                    f"UPDATE {STATE_TABLE} SET phase = 'cleanup', updated_at = ? WHERE name = ?",
+                    (time.time(), self.name),
+                )
+        finally:
+            self._execute("PRAGMA legacy_alter_table = OFF")
+            self._execute(f"PRAGMA foreign_keys = {1 if foreign_keys else 0}")
+
+    def cleanup(self):
+        """Empty the old table in throttled chunks, then drop it."""
+        old = self._q(self.old)
+        while True:
+            chunk_started = time.monotonic()
+            with self._transaction():
+                rows = self._execute(
+                    f"DELETE FROM {old} WHERE rowid IN (SELECT rowid FROM {old} LIMIT ?)",
+                    (self.chunk_size,),
+                ).rowcount
+            if not rows:
+                break
+            self._throttle(chunk_started, rows)
+        with self._transaction():
+            self._execute(f"DROP TABLE {old}")
+            self._execute(f"DELETE FROM {STATE_TABLE} WHERE name = ?", (self.name,))
+
+    def run(self):
+        self.prepare()
+        if self._state()[2] == "copying":
+            self.copy()
+            self.swap()
+        self.cleanup()
+
+
+def copy_and_swap(connection, table, name, **options):
+    """Rebuild ``table.name`` into ``table``'s schema online; see ``CopyAndSwap``."""
+    CopyAndSwap(connection, table, name, **options).run()
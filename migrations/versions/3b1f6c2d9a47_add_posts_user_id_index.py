@@ -0,0 +1,25 @@
+"""add posts.user_id index
+
+Revision ID: 3b1f6c2d9a47
+Revises: 266fa7b00ee0
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2d9a47'
+down_revision = '266fa7b00ee0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite (user_id, id): equality on user_id, rows already in id order.
+    op.create_index('ix_posts_user_id_id', 'posts', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_user_id_id', table_name='posts')
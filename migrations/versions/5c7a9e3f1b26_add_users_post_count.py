@@ -0,0 +1,97 @@
+"""add users.post_count
+
+Revision ID: 5c7a9e3f1b26
+Revises: 8e4d2a71c5b0
+Create Date: 2026-10-17 13:41:07.552918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7a9e3f1b26'
+down_revision = '8e4d2a71c5b0'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+SQLITE_CREATE_STATEMENTS = [
+    "CREATE TRIGGER posts_count_ai AFTER INSERT ON posts BEGIN "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = new.user_id; "
+    "END",
+    "CREATE TRIGGER posts_count_ad AFTER DELETE ON posts BEGIN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = old.user_id; "
+    "END",
+    "CREATE TRIGGER posts_count_au AFTER UPDATE OF user_id ON posts "
+    "WHEN old.user_id IS NOT new.user_id BEGIN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = old.user_id; "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = new.user_id; "
+    "END",
+]
+
+SQLITE_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_count_au",
+    "DROP TRIGGER IF EXISTS posts_count_ad",
+    "DROP TRIGGER IF EXISTS posts_count_ai",
+]
+
+POSTGRESQL_CREATE_STATEMENTS = [
+    "CREATE OR REPLACE FUNCTION posts_count_trigger() RETURNS trigger AS $$ "
+    "BEGIN "
+    "IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN RETURN NULL; END IF; "
+    "IF TG_OP IN ('INSERT', 'UPDATE') THEN "
+    "UPDATE users SET post_count = post_count + 1 WHERE id = NEW.user_id; END IF; "
+    "IF TG_OP IN ('DELETE', 'UPDATE') THEN "
+    "UPDATE users SET post_count = post_count - 1 WHERE id = OLD.user_id; END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE TRIGGER posts_count AFTER INSERT OR DELETE OR UPDATE OF user_id ON posts "
+    "FOR EACH ROW EXECUTE FUNCTION posts_count_trigger()",
+]
+
+POSTGRESQL_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_count ON posts",
+    "DROP FUNCTION IF EXISTS posts_count_trigger()",
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_CREATE_STATEMENTS, SQLITE_DROP_STATEMENTS),
+    'postgresql': (POSTGRESQL_CREATE_STATEMENTS, POSTGRESQL_DROP_STATEMENTS),
+}
+
+BACKFILL = sa.text(
+    "UPDATE users SET post_count = "
+    "(SELECT count(posts.id) FROM posts WHERE posts.user_id = users.id) "
+    "WHERE users.id > :low AND users.id <= :high"
+)
+
+
+def upgrade():
+    op.add_column(
+        'users', sa.Column('post_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    # Triggers first: posts written during the backfill are counted by the
+    # trigger and then recounted exactly when their author's batch runs.
+    create, _ = STATEMENTS.get(op.get_bind().dialect.name, ([], []))
+    for statement in create:
+        op.execute(statement)
+
+    # Commit each batch so the backfill never holds one long write lock.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text("SELECT max(id) FROM users")).scalar() or 0
+        for low in range(0, max_id, BACKFILL_BATCH_SIZE):
+            high = low + BACKFILL_BATCH_SIZE
+            bind.execute(BACKFILL, {'low': low, 'high': high})
+            print(f"post_count backfill: users {min(high, max_id)}/{max_id}")
+
+
+def downgrade():
+    _, drop = STATEMENTS.get(op.get_bind().dialect.name, ([], []))
+    for statement in drop:
+        op.execute(statement)
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('post_count')
@@ -0,0 +1,60 @@
+"""add posts full-text search index
+
+Revision ID: 8e4d2a71c5b0
+Revises: 3b1f6c2d9a47
+Create Date: 2026-10-17 10:03:18.902541
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4d2a71c5b0'
+down_revision = '3b1f6c2d9a47'
+branch_labels = None
+depends_on = None
+
+
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE posts_fts USING fts5("
+    "title, content, content='posts', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO posts_fts(posts_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+    # Index the rows that already exist.
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_fts_au",
+    "DROP TRIGGER IF EXISTS posts_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_fts_ai",
+    "DROP TABLE IF EXISTS posts_fts",
+]
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends use the LIKE fallback in search.py.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in CREATE_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
@@ -0,0 +1,93 @@
+"""add per-table versions for ETags
+
+Revision ID: a4d19c7e2f63
+Revises: 5c7a9e3f1b26
+Create Date: 2026-10-17 16:22:41.318064
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d19c7e2f63'
+down_revision = '5c7a9e3f1b26'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_CREATE_STATEMENTS = [
+    "CREATE TABLE table_versions ("
+    "name VARCHAR(20) NOT NULL PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+    "INSERT INTO table_versions (name, version) VALUES ('users', 0), ('posts', 0)",
+    "CREATE TRIGGER users_version_ai AFTER INSERT ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER users_version_ad AFTER DELETE ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER users_version_au AFTER UPDATE OF username, email ON users BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'users'; "
+    "END",
+    "CREATE TRIGGER posts_version_ai AFTER INSERT ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+    "CREATE TRIGGER posts_version_ad AFTER DELETE ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+    "CREATE TRIGGER posts_version_au AFTER UPDATE OF title, content, user_id ON posts BEGIN "
+    "UPDATE table_versions SET version = version + 1 WHERE name = 'posts'; "
+    "END",
+]
+
+SQLITE_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS users_version_ai",
+    "DROP TRIGGER IF EXISTS users_version_ad",
+    "DROP TRIGGER IF EXISTS users_version_au",
+    "DROP TRIGGER IF EXISTS posts_version_ai",
+    "DROP TRIGGER IF EXISTS posts_version_ad",
+    "DROP TRIGGER IF EXISTS posts_version_au",
+    "DROP TABLE IF EXISTS table_versions",
+]
+
+POSTGRESQL_CREATE_STATEMENTS = [
+    "CREATE SEQUENCE users_version_seq CACHE 1",
+    "CREATE SEQUENCE posts_version_seq CACHE 1",
+    "CREATE OR REPLACE FUNCTION table_version_trigger() RETURNS trigger AS $$ "
+    "BEGIN "
+    "PERFORM nextval(TG_ARGV[0]::regclass); "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE CONSTRAINT TRIGGER users_version "
+    "AFTER INSERT OR DELETE OR UPDATE OF username, email ON users "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+    "EXECUTE FUNCTION table_version_trigger('users_version_seq')",
+    "CREATE CONSTRAINT TRIGGER posts_version "
+    "AFTER INSERT OR DELETE OR UPDATE OF title, content, user_id ON posts "
+    "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+    "EXECUTE FUNCTION table_version_trigger('posts_version_seq')",
+]
+
+POSTGRESQL_DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_version ON posts",
+    "DROP TRIGGER IF EXISTS users_version ON users",
+    "DROP FUNCTION IF EXISTS table_version_trigger()",
+    "DROP SEQUENCE IF EXISTS posts_version_seq",
+    "DROP SEQUENCE IF EXISTS users_version_seq",
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_CREATE_STATEMENTS, SQLITE_DROP_STATEMENTS),
+    'postgresql': (POSTGRESQL_CREATE_STATEMENTS, POSTGRESQL_DROP_STATEMENTS),
+}
+
+
+def upgrade():
+    create, _ = STATEMENTS.get(op.get_bind().dialect.name, ([], []))
+    for statement in create:
+        op.execute(statement)
+
+
+def downgrade():
+    _, drop = STATEMENTS.get(op.get_bind().dialect.name, ([], []))
+    for statement in drop:
+        op.execute(statement)
@@ -15,8 +15,12 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True)
+    # Maintained by triggers on ``posts``; see counters.py.
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
-    posts = db.relationship("Post", backref="user", lazy=True)
+    posts = db.relationship(
+        "Post", back_populates="user", lazy=True, order_by="Post.id"
+    )
 
     def __repr__(self):  # pragma: no cover - convenience repr
         return f"<User {getattr(self, 'username', None)}>"
@@ -26,11 +30,16 @@ class Post(db.Model):
     """Represents a blog post written by a user."""
 
     __tablename__ = "posts"
+    # Serves ``WHERE user_id = ?`` lookups and per-user ``ORDER BY id`` scans
+    # (e.g. ``User.posts`` and keyset pagination of a user's posts).
+    __table_args__ = (db.Index("ix_posts_user_id_id", "user_id", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
+    user = db.relationship("User", back_populates="posts")
+
     def __repr__(self):  # pragma: no cover - convenience repr
         return f"<Post {getattr(self, 'title', None)}>"
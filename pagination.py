@@ -0,0 +1,155 @@
+"""Keyset pagination and streaming helpers for the list endpoints.
+
+Pages are addressed by the last primary key seen rather than by an offset, so
+every page is a single indexed range scan no matter how deep the client has
+paged. Cursors handed to clients are opaque tokens wrapping that key.
+"""
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request, stream_with_context
+
+from database import db
+from serialization import rows_to_dicts
+
+
+class PaginationError(ValueError):
+    """Raised when ``limit``/``after``/``stream`` query arguments are invalid."""
+
+
+def encode_token(payload):
+    """Return ``payload`` (a JSON-serialisable dict) as an opaque URL-safe token."""
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token):
+    """Return the dict wrapped by ``token``."""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise PaginationError("Invalid cursor") from None
+    if not isinstance(payload, dict):
+        raise PaginationError("Invalid cursor")
+    return payload
+
+
+def encode_cursor(last_id):
+    """Return an opaque cursor token pointing just past ``last_id``."""
+    return encode_token({"id": last_id})
+
+
+def decode_cursor(token):
+    """Return the primary key wrapped by ``token``."""
+    last_id = decode_token(token).get("id")
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise PaginationError("Invalid cursor")
+    return last_id
+
+
+def parse_limit(args, config=None):
+    """Return ``limit`` from ``args``, defaulted and capped by the app config."""
+    config = current_app.config if config is None else config
+    limit = args.get("limit", config["API_PAGE_SIZE"])
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise PaginationError("limit must be an integer") from None
+    if limit < 1:
+        raise PaginationError("limit must be positive")
+    return min(limit, config["API_MAX_PAGE_SIZE"])
+
+
+def page_args(args=None, config=None):
+    """Parse ``limit``, ``after`` and ``stream`` from the query string."""
+    args = request.args if args is None else args
+    limit = parse_limit(args, config)
+
+    after = args.get("after")
+    after_id = decode_cursor(after) if after else None
+
+    stream = args.get("stream")
+    if stream is not None and stream not in ("ndjson", "json"):
+        raise PaginationError("stream must be 'ndjson' or 'json'")
+
+    return limit, after_id, stream
+
+
+def _after(stmt, id_column, after_id):
+    if after_id is not None:
+        stmt = stmt.where(id_column > after_id)
+    return stmt.order_by(id_column)
+
+
+def keyset_statement(stmt, id_column, limit, after_id=None):
+    """Return ``stmt`` restricted to one page past ``after_id`` plus a look-ahead row."""
+    return _after(stmt, id_column, after_id).limit(limit + 1)
+
+
+def finish_page(rows, id_column, limit):
+    """Trim the look-ahead row from a page fetched with ``keyset_statement``.
+
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is ``None`` on the last page.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][id_column.key])
+    return rows, next_cursor
+
+
+def keyset_page(stmt, id_column, limit, after_id=None):
+    """Fetch one page of ``stmt`` ordered by ``id_column``.
+
+    Returns ``(rows, next_cursor)`` where ``rows`` is a list of dicts and
+    ``next_cursor`` is ``None`` on the last page.
+    """
+    stmt = keyset_statement(stmt, id_column, limit, after_id)
+    return finish_page(rows_to_dicts(db.session.execute(stmt)), id_column, limit)
+
+
+def page_response(rows, next_cursor):
+    """Build a JSON list response advertising the next page via headers."""
+    response = current_app.json.response(rows)
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args["after"] = next_cursor
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
+
+
+def stream_response(stmt, id_column, after_id=None, fmt="ndjson"):
+    """Stream every row of ``stmt`` past ``after_id`` without buffering.
+
+    Rows are pulled from a server-side cursor ``STREAM_YIELD_PER`` at a time
+    and written out either as NDJSON or as a chunked JSON array, so memory use
+    stays flat regardless of table size.
+    """
+    yield_per = current_app.config["STREAM_YIELD_PER"]
+    stmt = _after(stmt, id_column, after_id).execution_options(yield_per=yield_per)
+    dumps = current_app.json.dumps
+
+    def generate():
+        result = db.session.execute(stmt)
+        keys = list(result.keys())
+        try:
+            if fmt == "ndjson":
+                for row in result:
+                    yield dumps(dict(zip(keys, row))) + "\n"
+                return
+
+            yield "["
+            first = True
+            for row in result:
+                yield ("" if first else ",") + dumps(dict(zip(keys, row)))
+                first = False
+            yield "]"
+        finally:
+            result.close()
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,61 @@
+"""Sparse fieldsets for the read endpoints.
+
+``?fields=id,title`` narrows a response to the named attributes. The names
+are mapped to columns before the query is built, so unrequested columns
+(notably ``Post.content``) are never selected from the database, let alone
+serialised.
+"""
+from flask import request
+
+from models import Post, User
+
+USER_FIELDS = {"id": User.id, "username": User.username, "email": User.email}
+
+POST_FIELDS = {
+    "id": Post.id,
+    "title": Post.title,
+    "content": Post.content,
+    "user_id": Post.user_id,
+    "username": User.username,
+}
+
+USER_POST_FIELDS = {"id": Post.id, "title": Post.title, "content": Post.content}
+
+# Attributes of each ``/verify`` post entry; ``author`` is built from a join.
+VERIFY_POST_FIELDS = ("id", "title", "content", "user_id", "author")
+
+
+class FieldsError(ValueError):
+    """Raised when ``fields`` names an attribute the endpoint does not expose."""
+
+
+def requested_fields(available, always=("id",), args=None):
+    """Return the field names selected by ``?fields=``, in declaration order.
+
+    Without the argument every name in ``available`` is returned. Names in
+    ``always`` (the keyset column) are included regardless.
+    """
+    args = request.args if args is None else args
+    raw = args.get("fields")
+    if not raw:
+        return list(available)
+
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise FieldsError(
+            f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(available)}"
+        )
+    names.update(always)
+    return [name for name in available if name in names]
+
+
+def is_sparse(args=None):
+    """Return whether the request asked for a subset of fields."""
+    args = request.args if args is None else args
+    return bool(args.get("fields"))
+
+
+def columns(available, names):
+    """Return labelled columns for ``names`` from an ``available`` mapping."""
+    return [available[name].label(name) for name in names]
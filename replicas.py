@@ -0,0 +1,206 @@
+"""Optional read-replica routing.
+
+With ``DB_REPLICA_URLS`` set, each URL gets its own engine (``replica_0``,
+``replica_1``, ...) and ``RoutingSession.get_bind`` binds ``SELECT``s in
+views decorated with ``replica_reads`` to one of them, chosen round-robin
+per request and pinned for the rest of it; everything else (writes, other
+views, CLI commands) uses the primary. The replica engines are deliberately
+not ``SQLALCHEMY_BINDS`` entries, so ``db.create_all()`` and migrations
+never touch them.
+
+Replicas are health-checked with ``SELECT 1`` at most every
+``DB_REPLICA_CHECK_INTERVAL`` seconds; a failed check or a connection error
+during a query takes the replica out of rotation for
+``DB_REPLICA_RETRY_AFTER`` seconds. With no healthy replica, reads fall
+back to the primary.
+
+Read-your-writes: a request that writes sets a short-lived cookie
+(``DB_READ_YOUR_WRITES_SECONDS``) that routes the same client's next reads
+to the primary, so it does not see a replica that has not caught up yet.
+Cache fills (``UserCache.get_or_load``) also read the primary, so lagging
+data is never cached.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+
+from metrics import register_metrics
+
+PRIMARY_COOKIE = "db_primary_until"
+
+_READ_METHODS = ("GET", "HEAD")
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping unhealthy ones."""
+
+    def __init__(self, engines, check_interval, retry_after):
+        self.engines = dict(engines)
+        self.check_interval = check_interval
+        self.retry_after = retry_after
+        self._order = itertools.cycle(list(self.engines))
+        self._lock = threading.Lock()
+        self._checked_at = {}
+        self._down_until = {}
+        self.reads = dict.fromkeys(self.engines, 0)
+        self.failures = dict.fromkeys(self.engines, 0)
+        self.primary_fallbacks = 0
+
+        for key, engine in self.engines.items():
+            event.listen(engine, "handle_error", self._error_listener(key))
+
+    def _error_listener(self, key):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(key)
+
+        return handle_error
+
+    def mark_down(self, key):
+        with self._lock:
+            self.failures[key] += 1
+            self._down_until[key] = time.monotonic() + self.retry_after
+
+    def healthy(self, key):
+        """Return whether ``key`` may serve reads, re-checking it if due."""
+        now = time.monotonic()
+        if self._down_until.get(key, 0) > now:
+            return False
+        if now - self._checked_at.get(key, float("-inf")) < self.check_interval:
+            return True
+        try:
+            with self.engines[key].connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        except DBAPIError:
+            self.mark_down(key)
+            return False
+        self._checked_at[key] = now
+        return True
+
+    def choose(self):
+        """Return ``(key, engine)`` of the next healthy replica, or ``None``."""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                key = next(self._order)
+            if self.healthy(key):
+                self.reads[key] += 1
+                return key, self.engines[key]
+        self.primary_fallbacks += 1
+        return None
+
+    def snapshot(self):
+        now = time.monotonic()
+        return {
+            "replicas": {
+                key: {
+                    "healthy": self._down_until.get(key, 0) <= now,
+                    "reads": self.reads[key],
+                    "failures": self.failures[key],
+                }
+                for key in self.engines
+            },
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+def _read_your_writes():
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view):
+    """Let ``view`` read from a replica on GET/HEAD requests."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (
+            "replicas" in current_app.extensions
+            and request.method in _READ_METHODS
+            and not _read_your_writes()
+        ):
+            g.db_replica = True  # chosen lazily on the first SELECT
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Route reads inside the block to the primary, even in a replica view."""
+    if not has_request_context():
+        yield
+        return
+    previous = g.get("db_primary_only", False)
+    g.db_primary_only = True
+    try:
+        yield
+    finally:
+        g.db_primary_only = previous
+
+
+def _replica_engine():
+    if not has_request_context() or g.get("db_primary_only") or g.get("db_wrote"):
+        return None
+    choice = g.get("db_replica")
+    if choice is True:
+        choice = g.db_replica = current_app.extensions["replicas"].choose()
+    return choice[1] if choice else None
+
+
+class RoutingSession(Session):
+    """``db.session`` class that sends replica-eligible ``SELECT``s to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, "is_select", False):
+            engine = _replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _after_flush(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+event.listen(RoutingSession, "after_flush", _after_flush)
+
+
+def init_replicas(app, engine_options):
+    """Create the app's ``ReplicaSet`` from ``DB_REPLICA_URLS``, if any."""
+    urls = app.config.get("DB_REPLICA_URLS") or []
+    if not urls:
+        return None
+
+    replicas = {
+        f"replica_{index}": create_engine(
+            url, **(engine_options if not url.startswith("sqlite") else {})
+        )
+        for index, url in enumerate(urls)
+    }
+    replica_set = ReplicaSet(
+        replicas, app.config["DB_REPLICA_CHECK_INTERVAL"], app.config["DB_REPLICA_RETRY_AFTER"]
+    )
+    app.extensions["replicas"] = replica_set
+    register_metrics(app, "replicas", replica_set.snapshot)
+    window = app.config["DB_READ_YOUR_WRITES_SECONDS"]
+
+    @app.after_request
+    def pin_writer_to_primary(response):
+        # Bulk endpoints write through Core, which does not flush the session.
+        if g.get("db_wrote") or (request.method not in _READ_METHODS and response.status_code < 400):
+            response.set_cookie(
+                PRIMARY_COOKIE, f"{time.time() + window:.3f}", max_age=window, httponly=True
+            )
+        return response
+
+    return replica_set
@@ -0,0 +1,126 @@
+"""Aggregate integrity reports computed in SQL.
+
+These helpers push counting and orphan detection into grouped SQL statements
+so the database does the work and Python never hydrates a ``Post`` just to
+count it. They back ``/verify`` (in both the sync and ASGI apps) and can be
+called directly from a shell or script inside an application context.
+"""
+from sqlalchemy import func, null, select
+
+from counters import STATEMENTS
+from database import db
+from models import Post, User
+from serialization import rows_to_dicts
+
+
+def table_totals_statement():
+    """Return the single statement counting users, posts and orphaned posts."""
+    orphans = (
+        select(func.count(Post.id))
+        .outerjoin(User, Post.user_id == User.id)
+        .where(User.id.is_(None))
+        .scalar_subquery()
+    )
+    return select(
+        select(func.count(User.id)).scalar_subquery().label("users_count"),
+        select(func.count(Post.id)).scalar_subquery().label("posts_count"),
+        orphans.label("orphaned_posts"),
+    )
+
+
+def table_totals():
+    """Return users, posts and orphaned-post counts from a single statement."""
+    return db.session.execute(table_totals_statement()).one()._asdict()
+
+
+def _with_post_counts(columns, dialect=None):
+    """Select ``columns`` of ``users`` plus each user's post count.
+
+    ``users.post_count`` is read where triggers maintain it (see counters.py);
+    other dialects group ``posts`` instead.
+    """
+    if (dialect or db.engine.dialect.name) in STATEMENTS:
+        return select(*columns, User.post_count.label("posts_count"))
+    return (
+        select(*columns, func.count(Post.id).label("posts_count"))
+        .outerjoin(Post, Post.user_id == User.id)
+        .group_by(*columns)
+    )
+
+
+def posts_per_user_statement(dialect=None):
+    """Return the select listing every user's post count, by id."""
+    return _with_post_counts([User.id, User.username], dialect).order_by(User.id)
+
+
+def posts_per_user():
+    """Return ``{"id", "username", "posts_count"}`` for every user, by id."""
+    return rows_to_dicts(db.session.execute(posts_per_user_statement()))
+
+
+def integrity_report():
+    """Return table totals, per-user post counts and orphan count."""
+    report = table_totals()
+    report["users"] = posts_per_user()
+    return report
+
+
+def verify_statements(include_content=True, dialect=None):
+    """Return the ``(users, posts)`` selects behind the full ``/verify`` report.
+
+    Post content is replaced by ``NULL`` unless ``include_content`` is set, so
+    it is never read when the caller does not return it. ``dialect`` defaults
+    to the app's engine.
+    """
+    users = _with_post_counts([User.id, User.username, User.email], dialect).order_by(User.id)
+    content = Post.content if include_content else null()
+    posts = (
+        select(Post.id, Post.title, content, Post.user_id, User.username, User.email)
+        .outerjoin(User, Post.user_id == User.id)
+        .order_by(Post.id)
+    )
+    return users, posts
+
+
+def assemble_verify(totals, user_rows, post_rows, post_fields):
+    """Build the ``/verify`` payload from ``verify_statements`` results.
+
+    Each post row is attached to its author's entry in ``users``; orphaned
+    posts are listed with ``author`` set to ``None``.
+    """
+    report = {
+        "users_count": totals["users_count"],
+        "posts_count": totals["posts_count"],
+        "orphaned_posts": totals["orphaned_posts"],
+        "users": [],
+        "posts": [],
+    }
+
+    users_by_id = {}
+    for user_id, username, email, post_count in user_rows:
+        user = {
+            "id": user_id,
+            "username": username,
+            "email": email,
+            "posts_count": post_count,
+            "posts": [],
+        }
+        users_by_id[user_id] = user
+        report["users"].append(user)
+
+    for post_id, title, content, user_id, username, email in post_rows:
+        author = None
+        if username is not None:
+            author = {"id": user_id, "username": username, "email": email}
+            users_by_id[user_id]["posts"].append({"id": post_id, "title": title})
+
+        post = {
+            "id": post_id,
+            "title": title,
+            "content": content,
+            "user_id": user_id,
+            "author": author,
+        }
+        report["posts"].append({name: post[name] for name in post_fields})
+
+    return report
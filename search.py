@@ -0,0 +1,199 @@
+"""Full-text search over post titles and content.
+
+On SQLite the ``posts_fts`` FTS5 table indexes ``posts`` as external content
+(it stores only the index, not a second copy of the text) and is kept in sync
+by triggers. Results are ranked with BM25, title matches weighted above
+content matches, and paged by an opaque ``(rank, id)`` keyset cursor. Other
+backends, or SQLite databases that have not been migrated yet, fall back to
+``LIKE`` matching ordered by id.
+
+Either way each result's ``snippet`` is HTML: the post text escaped, with
+matches wrapped in ``<mark>``.
+"""
+import html
+import re
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import DDL, event, inspect, text
+
+from database import begin_transaction, db
+from models import Post, User
+from pagination import PaginationError, decode_token, encode_token, keyset_page
+from serialization import rows_to_dicts
+
+# Duplicated in the revision that installs the index on existing databases;
+# keep the two copies in step.
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE posts_fts USING fts5("
+    "title, content, content='posts', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO posts_fts(posts_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS posts_fts_au",
+    "DROP TRIGGER IF EXISTS posts_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_fts_ai",
+    "DROP TABLE IF EXISTS posts_fts",
+]
+
+SNIPPET_TOKENS = 12
+
+# Non-HTML placeholders for the highlight tags, swapped in after escaping.
+MARK_OPEN, MARK_CLOSE = "\x02", "\x03"
+
+_FTS_QUERY = """
+SELECT p.id AS id, p.title AS title, p.user_id AS user_id, u.username AS username,
+       snippet(posts_fts, -1, :mark_open, :mark_close, '…', :tokens) AS snippet,
+       posts_fts.rank AS rank
+FROM posts_fts
+JOIN posts AS p ON p.id = posts_fts.rowid
+LEFT JOIN users AS u ON u.id = p.user_id
+WHERE posts_fts MATCH :match {after}
+ORDER BY posts_fts.rank, p.id
+LIMIT :limit
+"""
+
+_FTS_AFTER = "AND (posts_fts.rank > :rank OR (posts_fts.rank = :rank AND p.id > :id))"
+
+# ``db.create_all()`` (tests, ``flask seed``) builds the index alongside posts.
+for _statement in CREATE_STATEMENTS:
+    event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in DROP_STATEMENTS:
+    event.listen(Post.__table__, "before_drop", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def parse_terms(query):
+    """Split ``query`` into ``(word, is_prefix)`` pairs, dropping punctuation."""
+    return [(word, star == "*") for word, star in re.findall(r"(\w+)(\*?)", query or "")]
+
+
+def match_expression(terms):
+    """Build an FTS5 ``MATCH`` string requiring every term.
+
+    Terms are quoted so user input cannot inject FTS5 query syntax.
+    """
+    return " ".join(f'"{word}"' + ("*" if prefix else "") for word, prefix in terms)
+
+
+def fts_available():
+    """Return whether the current database has the ``posts_fts`` index."""
+    key = "search_fts"
+    if key not in current_app.extensions:
+        engine = db.engine
+        current_app.extensions[key] = engine.dialect.name == "sqlite" and inspect(
+            engine
+        ).has_table("posts_fts")
+    return current_app.extensions[key]
+
+
+@contextmanager
+def deferred_indexing():
+    """Skip per-row index updates while bulk-loading posts, then rebuild once.
+
+    Drops the insert trigger inside the caller's transaction and rebuilds
+    ``posts_fts`` from ``posts`` on exit, which is several times cheaper
+    than indexing row by row. The trigger is recreated however the block
+    exits, and rolling the transaction back also undoes the drop. A no-op
+    without the FTS index.
+    """
+    if not fts_available():
+        yield
+        return
+    begin_transaction()
+    db.session.execute(text("DROP TRIGGER posts_fts_ai"))
+    try:
+        yield
+    finally:
+        db.session.execute(text(CREATE_STATEMENTS[2]))
+        db.session.execute(text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+
+
+def _fts_search(terms, limit, after):
+    params = {
+        "match": match_expression(terms),
+        "limit": limit + 1,
+        "tokens": SNIPPET_TOKENS,
+        "mark_open": MARK_OPEN,
+        "mark_close": MARK_CLOSE,
+    }
+    clause = ""
+    if after is not None:
+        rank, last_id = after.get("rank"), after.get("id")
+        if not isinstance(rank, (int, float)) or not isinstance(last_id, int):
+            raise PaginationError("Invalid cursor")
+        params.update(rank=rank, id=last_id)
+        clause = _FTS_AFTER
+
+    rows = rows_to_dicts(db.session.execute(text(_FTS_QUERY.format(after=clause)), params))
+    for row in rows:
+        row["snippet"] = highlight(row["snippet"])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_token({"rank": rows[-1]["rank"], "id": rows[-1]["id"]})
+    return rows, next_cursor
+
+
+def highlight(marked):
+    """HTML-escape ``marked`` and turn its placeholders into ``<mark>`` tags."""
+    return html.escape(marked).replace(MARK_OPEN, "<mark>").replace(MARK_CLOSE, "</mark>")
+
+
+def _excerpt(content, words):
+    lowered = content.lower()
+    positions = [lowered.find(word.lower()) for word in words]
+    start = min((pos for pos in positions if pos >= 0), default=0)
+    start = max(start - 40, 0)
+    excerpt = content[start:start + 160]
+    pattern = "|".join(re.escape(word) for word in words)
+    excerpt = re.sub(pattern, lambda m: MARK_OPEN + m.group(0) + MARK_CLOSE, excerpt, flags=re.I)
+    excerpt = ("…" if start else "") + excerpt + ("…" if start + 160 < len(content) else "")
+    return highlight(excerpt)
+
+
+def _like_search(terms, limit, after):
+    if after is not None and (not isinstance(after.get("id"), int) or "rank" in after):
+        raise PaginationError("Invalid cursor")
+
+    stmt = db.select(Post.id, Post.title, Post.user_id, User.username, Post.content).outerjoin(
+        User, Post.user_id == User.id
+    )
+    for word, _ in terms:
+        stmt = stmt.where(
+            Post.title.icontains(word, autoescape=True) | Post.content.icontains(word, autoescape=True)
+        )
+    rows, next_cursor = keyset_page(stmt, Post.id, limit, after and after["id"])
+    words = [word for word, _ in terms]
+    for row in rows:
+        row["snippet"] = _excerpt(row.pop("content"), words)
+        row["rank"] = None
+    return rows, next_cursor
+
+
+def search_posts(query, limit, after_token=None):
+    """Return ``(rows, next_cursor)`` for posts matching every word of ``query``.
+
+    Raises ``PaginationError`` for an empty query or a malformed cursor.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        raise PaginationError("q must contain at least one word")
+    after = decode_token(after_token) if after_token else None
+
+    if fts_available():
+        return _fts_search(terms, limit, after)
+    return _like_search(terms, limit, after)
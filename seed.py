@@ -0,0 +1,208 @@
+"""Sample data seeding for development databases.
+
+Seeding used to run as a ``before_request`` hook that queried ``users`` on
+every hit. It now lives behind the ``flask seed`` command, with an optional
+once-per-process check for the development server controlled by
+``Config.AUTO_SEED``.
+
+``flask seed --users N --posts-per-user DIST`` also generates synthetic data
+for load testing. ``DIST`` is either a fixed count or ``zipf:MEAN[:S]``,
+which spreads ``N * MEAN`` posts over the authors with Zipfian skew (a few
+prolific authors, a long tail with one post or none). Content lengths vary
+log-normally. Output is deterministic for a given ``--seed``.
+"""
+import bisect
+import itertools
+import random
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from database import db
+from models import Post, User
+from counters import deferred_counting
+from search import deferred_indexing
+
+SAMPLE_USERS = [
+    ("alice", "alice@example.com"),
+    ("bob", "bob@example.com"),
+    ("charlie", "charlie@example.com"),
+]
+
+SAMPLE_POSTS = [
+    ("First Post", "This is Alice's first post", "alice"),
+    ("Hello World", "Bob's introduction to blogging", "bob"),
+    ("Learning SQLAlchemy", "Charlie explores database relationships", "charlie"),
+    ("Second Post", "Alice's second post about Flask", "alice"),
+]
+
+# Database URLs already checked or seeded by this process.
+_initialised = set()
+
+# Rows per executemany batch; all batches share one transaction.
+SEED_BATCH_SIZE = 50_000
+
+ZIPF_EXPONENT = 1.1
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua flask sqlalchemy query index cursor "
+    "session engine migration schema table column transaction commit post user"
+).split()
+
+
+def seed_sample_data():
+    """Insert the alice/bob/charlie sample set if ``users`` is empty.
+
+    Returns ``True`` when rows were inserted.
+    """
+    if db.session.execute(db.select(User.id).limit(1)).first() is not None:
+        return False
+
+    users = {name: User(username=name, email=email) for name, email in SAMPLE_USERS}
+    db.session.add_all(users.values())
+    db.session.add_all(
+        Post(title=title, content=content, user=users[author])
+        for title, content, author in SAMPLE_POSTS
+    )
+    db.session.commit()
+    return True
+
+
+def parse_distribution(spec):
+    """Parse a ``--posts-per-user`` value into ``(kind, mean, exponent)``.
+
+    Accepts a non-negative integer (every user gets exactly that many posts)
+    or ``zipf:MEAN[:EXPONENT]``.
+    """
+    spec = str(spec).strip()
+    try:
+        if spec.isdigit():
+            return "fixed", int(spec), None
+        kind, _, rest = spec.partition(":")
+        if kind == "zipf" and rest:
+            mean, _, exponent = rest.partition(":")
+            mean, exponent = float(mean), float(exponent) if exponent else ZIPF_EXPONENT
+            if mean >= 0 and exponent > 0:
+                return "zipf", mean, exponent
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid posts-per-user {spec!r}; use a count or zipf:MEAN[:EXPONENT]")
+
+
+def _authors(rng, user_ids, kind, mean, exponent):
+    """Yield the author id of every generated post, grouped by author."""
+    if kind == "fixed":
+        for user_id in user_ids:
+            yield from itertools.repeat(user_id, mean)
+        return
+
+    # Rank r gets weight 1/r**s; ranks are shuffled over users so the
+    # prolific authors are not simply the lowest ids.
+    ranked = list(user_ids)
+    rng.shuffle(ranked)
+    weights = list(itertools.accumulate(1 / rank**exponent for rank in range(1, len(ranked) + 1)))
+    counts = dict.fromkeys(user_ids, 0)
+    total = weights[-1]
+    for _ in range(round(len(ranked) * mean)):
+        counts[ranked[bisect.bisect(weights, rng.random() * total)]] += 1
+    for user_id in user_ids:
+        yield from itertools.repeat(user_id, counts[user_id])
+
+
+def _content_factory(rng, corpus_size=1 << 16, lengths=4096):
+    """Return a function producing text slices of log-normal length (median ~200 chars).
+
+    Slices of one random corpus, with lengths drawn from a precomputed
+    table, keep generation cheap enough for millions of rows.
+    """
+    corpus = " ".join(rng.choices(_WORDS, k=corpus_size // 5))
+    table = [min(max(int(rng.lognormvariate(5.3, 0.8)), 20), 4000) for _ in range(lengths)]
+    span = len(corpus) - max(table)
+    choice, random_ = rng.choice, rng.random
+
+    def content():
+        length = choice(table)
+        offset = int(random_() * span)
+        return corpus[offset:offset + length]
+
+    return content
+
+
+def _insert_batched(model, rows, batch_size):
+    # Core executemany on the session's connection, bypassing the ORM bulk path.
+    connection = db.session.connection()
+    count = 0
+    for batch in iter(lambda: list(itertools.islice(rows, batch_size)), []):
+        connection.execute(db.insert(model.__table__), batch)
+        count += len(batch)
+    return count
+
+
+def seed_synthetic_data(users, posts_per_user, seed=0, batch_size=SEED_BATCH_SIZE):
+    """Insert ``users`` generated users and their posts in one transaction.
+
+    ``posts_per_user`` is a count or a distribution accepted by
+    ``parse_distribution``. Rows are inserted with Core ``executemany``
+    batches of ``batch_size``. Returns ``(users_inserted, posts_inserted)``.
+    """
+    kind, mean, exponent = parse_distribution(posts_per_user)
+    rng = random.Random(seed)
+    content = _content_factory(rng)
+    start = db.session.execute(db.select(db.func.max(User.id))).scalar() or 0
+    user_ids = range(start + 1, start + users + 1)
+
+    user_rows = (
+        {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.com"}
+        for user_id in user_ids
+    )
+    post_rows = (
+        {"title": f"Post {n} by user{user_id}", "content": content(), "user_id": user_id}
+        for user_id, group in itertools.groupby(_authors(rng, user_ids, kind, mean, exponent))
+        for n, _ in enumerate(group, 1)
+    )
+    with deferred_indexing(), deferred_counting():
+        user_count = _insert_batched(User, user_rows, batch_size)
+        post_count = _insert_batched(Post, post_rows, batch_size)
+    db.session.commit()
+    return user_count, post_count
+
+
+def ensure_seeded():
+    """Seed the sample data at most once per process and database."""
+    url = current_app.config["SQLALCHEMY_DATABASE_URI"]
+    if url in _initialised:
+        return
+    seed_sample_data()
+    _initialised.add(url)
+
+
+@click.command("seed")
+@click.option("--users", default=0, show_default=True, help="Extra generated users to insert.")
+@click.option(
+    "--posts-per-user",
+    default="0",
+    show_default=True,
+    help="Posts per generated user: a count, or zipf:MEAN[:EXPONENT] for skewed authorship.",
+)
+@click.option("--seed", "seed", default=0, show_default=True, help="Random seed for generated data.")
+@with_appcontext
+def seed_command(users, posts_per_user, seed):
+    """Create tables and load sample data."""
+    try:
+        parse_distribution(posts_per_user)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="--posts-per-user")
+    db.create_all()
+    if seed_sample_data():
+        click.echo("Inserted sample users and posts.")
+    if users:
+        start = time.perf_counter()
+        user_count, post_count = seed_synthetic_data(users, posts_per_user, seed=seed)
+        click.echo(
+            f"Inserted {user_count} users and {post_count} posts "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
+    _initialised.add(current_app.config["SQLALCHEMY_DATABASE_URI"])
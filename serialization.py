@@ -0,0 +1,76 @@
+"""JSON encoding and row serialisation for API responses.
+
+``OrjsonProvider`` replaces Flask's stdlib-based JSON provider when
+``orjson`` is installed: it encodes straight to bytes and skips key sorting,
+which is where most of the response CPU went on the large list endpoints.
+``rows_to_dicts`` turns Core result rows into plain dicts so read endpoints
+never need to hydrate ``User``/``Post`` instances just to serialise them.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider without key sorting."""
+
+    sort_keys = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by ``orjson``.
+
+    Values orjson cannot encode natively (dates, decimals, UUIDs, objects
+    with ``__html__``) go through Flask's default hook, so output matches
+    the stdlib provider.
+    """
+
+    def _options(self, indent=False):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        indent = bool(kwargs.get("indent"))
+        return orjson.dumps(obj, default=_default, option=self._options(indent)).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._options(indent)) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+PROVIDERS = {"stdlib": StdlibJSONProvider, "orjson": OrjsonProvider}
+
+
+def init_json(app):
+    """Install the provider named by ``JSON_PROVIDER`` ("auto", "orjson", "stdlib")."""
+    name = app.config["JSON_PROVIDER"]
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    app.json = PROVIDERS[name](app)
+
+
+def rows_to_dicts(result):
+    """Return a list of ``{column: value}`` dicts for a Core ``Result``."""
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def dumps_bytes(obj):
+    """Encode ``obj`` as compact JSON bytes outside a Flask app (orjson if available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
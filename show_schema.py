@@ -9,9 +9,8 @@ app = create_app()
 with app.app_context():
     db.create_all()
     
-    # Get database file path
-    db_url = app.config['SQLALCHEMY_DATABASE_URI']
-    db_path = db_url.replace('sqlite:///', '')
+    # Get database file path (relative SQLite URLs resolve to the instance folder)
+    db_path = db.engine.url.database
     
     # Connect to SQLite database
     conn = sqlite3.connect(db_path)
@@ -24,7 +23,7 @@ with app.app_context():
     # Get User table info
     print("\n1. USER TABLE SCHEMA:")
     print("-" * 70)
-    cursor.execute("PRAGMA table_info(user)")
+    cursor.execute("PRAGMA table_info(users)")
     columns = cursor.fetchall()
     for col in columns:
         col_id, name, type_, notnull, dflt_value, pk = col
@@ -59,13 +58,13 @@ with app.app_context():
     print("\n4. FOREIGN KEY INTEGRITY CHECK:")
     print("-" * 70)
     
-    cursor.execute("SELECT COUNT(*) FROM posts WHERE user_id NOT IN (SELECT id FROM user)")
+    cursor.execute("SELECT COUNT(*) FROM posts WHERE user_id NOT IN (SELECT id FROM users)")
     orphaned = cursor.fetchone()[0]
     
     cursor.execute("SELECT COUNT(*) FROM posts")
     total_posts = cursor.fetchone()[0]
     
-    cursor.execute("SELECT COUNT(*) FROM user")
+    cursor.execute("SELECT COUNT(*) FROM users")
     total_users = cursor.fetchone()[0]
     
     print(f"   Total Users: {total_users}")
@@ -83,13 +82,20 @@ with app.app_context():
     print("SAMPLE DATA RELATIONSHIPS:")
     print("-" * 70)
     
-    cursor.execute("""
-    SELECT u.id, u.username, COUNT(p.id) as post_count
-    FROM user u
-    LEFT JOIN posts p ON u.id = p.user_id
-    GROUP BY u.id, u.username
-    ORDER BY u.id
-    """)
+    cursor.execute("PRAGMA table_info(users)")
+    if "post_count" in [col[1] for col in cursor.fetchall()]:
+        # Maintained by triggers (see counters.py); check drift with
+        # ``flask reconcile-post-counts``.
+        cursor.execute("SELECT id, username, post_count FROM users ORDER BY id")
+    else:
+        # Databases created before users.post_count existed.
+        cursor.execute("""
+        SELECT u.id, u.username, COUNT(p.id) as post_count
+        FROM users u
+        LEFT JOIN posts p ON u.id = p.user_id
+        GROUP BY u.id, u.username
+        ORDER BY u.id
+        """)
     
     relationships = cursor.fetchall()
     for user_id, username, post_count in relationships:
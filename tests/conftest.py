@@ -2,12 +2,14 @@ import sys
 from pathlib import Path
 
 import pytest
+from sqlalchemy import event
 
 # Ensure the repository root is on the import path when tests run in CI
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
 from app import create_app, db  # noqa: E402
+from models import Post, User  # noqa: E402
 
 
 @pytest.fixture()
@@ -34,3 +36,32 @@ def client(app):
 @pytest.fixture()
 def runner(app):
     return app.test_cli_runner()
+
+
+@pytest.fixture()
+def query_counter(app):
+    """Collect every SQL statement the engine executes during a test."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture()
+def seed(app):
+    """Return a helper that inserts ``users`` users with ``posts_per_user`` posts each."""
+
+    def _seed(users=5, posts_per_user=2):
+        start = User.query.count()
+        for i in range(start, start + users):
+            user = User(username=f"user{i}", email=f"user{i}@example.com")
+            db.session.add(user)
+            for j in range(posts_per_user):
+                db.session.add(Post(title=f"T{i}-{j}", content="Body", user=user))
+        db.session.commit()
+
+    return _seed
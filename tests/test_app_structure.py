@@ -1,4 +1,8 @@
 import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
 
 from app import create_app, db
 
@@ -15,6 +19,27 @@ def test_models_importable():
     assert hasattr(models, "Post"), "Post model should exist"
 
 
+def test_import_is_lazy(tmp_path):
+    # A fresh interpreter: importing the module builds no app and skips Alembic.
+    code = (
+        "import sys, app\n"
+        "assert 'app' not in vars(app) and 'flask_migrate' not in sys.modules\n"
+        "assert app.app is app.app and app.app.name == 'app'\n"
+    )
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'lazy.db'}"}
+    subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1], env=env, check=True
+    )
+
+
+def test_db_command_loads_flask_migrate(runner):
+    result = runner.invoke(args=["db", "--help"])
+    assert result.exit_code == 0
+    assert "--directory" in result.output
+    assert "upgrade" in result.output
+    assert "migrate" in runner.app.extensions
+
+
 def test_db_extension_initialized(app):
     # The extension should be bound to the application context
     assert db.engine.url.database in (":memory:", "blog.db")
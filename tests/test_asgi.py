@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from app import create_app, db  # noqa: E402
+from asgi import create_asgi_app  # noqa: E402
+from models import Post, User  # noqa: E402
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": url})
+    with app.app_context():
+        db.create_all()
+        alice = User(username="alice", email="alice@example.com")
+        db.session.add_all(
+            [alice, User(username="bob"), Post(title="Hi", content="Body", user=alice)]
+        )
+        db.session.commit()
+    return url
+
+
+def _get(asgi_app, path, query=""):
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query.encode()}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await asgi_app(scope, receive, send)
+        await asgi_app.engine.dispose()
+
+    asyncio.run(run())
+    start, body = messages
+    return start["status"], dict(start["headers"]), json.loads(body["body"])
+
+
+def test_async_read_routes_match_sync_shapes(db_url):
+    asgi_app = create_asgi_app({"SQLALCHEMY_DATABASE_URI": db_url})
+
+    status, _, users = _get(asgi_app, "/users")
+    assert status == 200
+    assert [u["username"] for u in users] == ["alice", "bob"]
+
+    _, _, posts = _get(asgi_app, "/posts", "fields=title")
+    assert posts == [{"id": 1, "title": "Hi"}]
+
+    _, _, user = _get(asgi_app, "/users/1")
+    assert user["posts"] == [{"id": 1, "title": "Hi", "content": "Body"}]
+
+    _, _, verify = _get(asgi_app, "/verify")
+    assert verify["users"][0]["posts_count"] == 1
+    assert verify["posts"][0]["author"]["username"] == "alice"
+
+
+def test_async_pagination_and_errors(db_url):
+    asgi_app = create_asgi_app({"SQLALCHEMY_DATABASE_URI": db_url})
+
+    status, headers, page = _get(asgi_app, "/users", "limit=1")
+    assert status == 200 and len(page) == 1
+    cursor = headers[b"x-next-cursor"].decode()
+    _, _, rest = _get(asgi_app, "/users", f"limit=1&after={cursor}")
+    assert [u["username"] for u in rest] == ["bob"]
+
+    assert _get(asgi_app, "/users/99")[0] == 404
+    assert _get(asgi_app, "/users/1/posts", "fields=secret")[0] == 400
+    assert _get(asgi_app, "/nowhere")[0] == 404
+
+
+def test_relative_sqlite_url_opens_the_flask_database(tmp_path, monkeypatch):
+    url = "sqlite:///relative.db"
+    flask_app = create_app({"SQLALCHEMY_DATABASE_URI": url})
+    with flask_app.app_context():
+        expected = db.engine.url.database
+
+    monkeypatch.chdir(tmp_path)  # must not depend on the working directory
+    asgi_app = create_asgi_app({"SQLALCHEMY_DATABASE_URI": url})
+    assert asgi_app.engine.url.drivername == "sqlite+aiosqlite"
+    assert asgi_app.engine.url.database == expected
@@ -0,0 +1,63 @@
+import json
+
+from app import db
+from models import Post, User
+
+
+def test_bulk_users_reports_per_row_errors(client, app):
+    payload = [
+        {"username": "ann", "email": "ann@example.com"},
+        {"email": "missing@example.com"},
+        {"username": "ann"},
+        {"username": "bea", "email": "ann@example.com"},
+        {"username": "cal"},
+    ]
+    response = client.post("/users/bulk?chunk_size=2", json=payload)
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data["inserted"] == 2
+    assert [error["index"] for error in data["errors"]] == [1, 2, 3]
+    assert User.query.count() == 2
+
+
+def test_bulk_posts_from_ndjson_checks_authors_per_chunk(client, seed, query_counter):
+    seed(users=2, posts_per_user=0)
+    lines = [{"title": f"T{i}", "content": "Body", "user_id": 1 + i % 2} for i in range(10)]
+    lines.append({"title": "Bad", "content": "Body", "user_id": 99})
+    body = "\n".join(json.dumps(line) for line in lines) + "\nnot json\n"
+
+    query_counter.clear()
+    response = client.post(
+        "/posts/bulk?chunk_size=5", data=body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data["inserted"] == 10
+    assert data["errors"] == [
+        {"index": 10, "message": "User not found"},
+        {"index": 11, "message": "Invalid JSON"},
+    ]
+    author_checks = [s for s in query_counter if "WHERE users.id IN" in s]
+    assert len(author_checks) == 3
+    assert Post.query.count() == 10
+
+
+def test_bulk_posts_insert_each_chunk_in_one_statement(client, seed, query_counter):
+    seed(users=1, posts_per_user=0)
+    payload = [{"title": f"T{i}", "content": "Body", "user_id": 1} for i in range(300)]
+
+    query_counter.clear()
+    response = client.post("/posts/bulk?chunk_size=150", json=payload)
+    assert response.status_code == 201
+
+    inserts = [s for s in query_counter if s.startswith("INSERT INTO posts")]
+    assert len(inserts) == 2
+    ids = response.get_json()["ids"]
+    titles = dict(db.session.execute(db.select(Post.id, Post.title)).all())
+    assert [titles[post_id] for post_id in ids] == [row["title"] for row in payload]
+
+
+def test_bulk_rejects_non_array_body(client):
+    assert client.post("/users/bulk", json={"username": "solo"}).status_code == 400
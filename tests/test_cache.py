@@ -0,0 +1,48 @@
+import time
+
+from app import db
+from cache import LRUCache
+from models import Post, User
+
+
+def test_lru_cache_bounds_size_and_expires():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None, "least recently used entry should be evicted"
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+
+def test_user_reads_are_cached_until_a_post_is_written(client, app, seed, query_counter):
+    seed(users=1, posts_per_user=1)
+    cache = app.extensions["user_cache"]
+
+    assert len(client.get("/users/1").get_json()["posts"]) == 1
+    query_counter.clear()
+    assert len(client.get("/users/1").get_json()["posts"]) == 1
+    assert query_counter == []
+    # One lookup for the payload and one for its ETag watermark per request
+    assert cache.hits == 2 and cache.misses == 2
+
+    client.post("/posts", json={"title": "New", "content": "Body", "user_id": 1})
+    assert len(client.get("/users/1").get_json()["posts"]) == 2
+
+
+def test_user_update_and_bulk_insert_invalidate(client, app, seed):
+    seed(users=1, posts_per_user=0)
+    client.get("/users/1/posts")
+
+    user = db.session.get(User, 1)
+    user.username = "renamed"
+    db.session.commit()
+    assert client.get("/users/1/posts").get_json()["username"] == "renamed"
+
+    client.post("/posts/bulk", json=[{"title": "B", "content": "Body", "user_id": 1}])
+    assert len(client.get("/users/1/posts").get_json()["posts"]) == 1
+    assert Post.query.count() == 1
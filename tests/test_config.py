@@ -0,0 +1,18 @@
+from app import create_app, db
+from config import ProductionConfig, get_config
+
+
+def test_production_profile_applies_sqlite_pragmas(tmp_path):
+    assert get_config("production") is ProductionConfig
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'prod.db'}",
+            "SQLITE_PRAGMAS": ProductionConfig.SQLITE_PRAGMAS,
+        }
+    )
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
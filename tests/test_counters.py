@@ -0,0 +1,63 @@
+from sqlalchemy import text
+
+from app import db
+from models import Post, User
+from seed import seed_synthetic_data
+
+
+def counts():
+    return dict(db.session.execute(db.select(User.username, User.post_count)).all())
+
+
+def test_triggers_track_orm_and_bulk_writes(app, client, seed):
+    seed(users=2, posts_per_user=2)
+    assert counts() == {"user0": 2, "user1": 2}
+
+    post = db.session.execute(db.select(Post).filter_by(title="T0-0")).scalar_one()
+    post.user_id = db.session.execute(db.select(User.id).filter_by(username="user1")).scalar()
+    db.session.commit()
+    assert counts() == {"user0": 1, "user1": 3}
+
+    db.session.delete(post)
+    db.session.commit()
+    assert counts() == {"user0": 1, "user1": 2}
+
+    user_id = db.session.execute(db.select(User.id).filter_by(username="user0")).scalar()
+    response = client.post(
+        "/posts/bulk", json=[{"title": f"B{i}", "content": "C", "user_id": user_id} for i in range(3)]
+    )
+    assert response.status_code == 201
+    assert counts() == {"user0": 4, "user1": 2}
+
+
+def test_seeded_counts_match_posts(app):
+    seed_synthetic_data(50, "zipf:4", seed=1)
+    actual = dict(
+        db.session.execute(
+            db.select(User.username, db.func.count(Post.id))
+            .outerjoin(Post, Post.user_id == User.id)
+            .group_by(User.id)
+        ).all()
+    )
+    assert counts() == actual
+
+    # The triggers are back in place after the bulk load.
+    db.session.add(Post(title="t", content="c", user_id=1))
+    db.session.commit()
+    assert counts()["user1"] == actual["user1"] + 1
+
+
+def test_reconcile_reports_and_fixes_drift(app, runner, seed):
+    seed(users=3, posts_per_user=2)
+    db.session.execute(text("UPDATE users SET post_count = 9 WHERE username = 'user1'"))
+    db.session.commit()
+
+    result = runner.invoke(args=["reconcile-post-counts", "--batch-size", "2"])
+    assert result.exit_code != 0
+    assert "user 2 (user1): stored 9, actual 2" in result.output
+
+    result = runner.invoke(args=["reconcile-post-counts", "--fix"])
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+    assert counts() == {"user0": 2, "user1": 2, "user2": 2}
+    assert "All post counts match." in runner.invoke(args=["reconcile-post-counts"]).output
@@ -0,0 +1,78 @@
+import pytest
+
+from app import db
+from models import Post
+
+
+@pytest.mark.parametrize("url", ["/users", "/posts", "/users/1", "/users/1/posts"])
+def test_matching_etag_returns_304_without_loading_rows(client, seed, query_counter, url):
+    seed(users=2, posts_per_user=2)
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    query_counter.clear()
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.get_data() == b""
+    assert len(query_counter) <= 1, "only the watermark query may run"
+    assert all("count(" not in statement for statement in query_counter)
+
+
+def test_etag_changes_after_insert_and_update(client, seed):
+    seed(users=1, posts_per_user=1)
+    before = client.get("/posts").headers["ETag"]
+    user_before = client.get("/users/1").headers["ETag"]
+
+    post = db.session.get(Post, 1)
+    post.content = "Edited"
+    db.session.commit()
+    after_update = client.get("/posts").headers["ETag"]
+    assert after_update != before
+    assert client.get("/users/1", headers={"If-None-Match": user_before}).status_code == 200
+
+    client.post("/posts", json={"title": "New", "content": "Body", "user_id": 1})
+    assert client.get("/posts", headers={"If-None-Match": after_update}).status_code == 200
+
+
+def test_tags_follow_writes_from_other_workers(client, seed):
+    seed(users=2, posts_per_user=1)
+    posts_tag = client.get("/posts").headers["ETag"]
+
+    # Raw SQL does not go through this process's ORM events, like a write
+    # made by another worker; the triggers still bump the shared version.
+    db.session.execute(db.text("UPDATE posts SET content = 'Edited' WHERE id = 1"))
+    db.session.commit()
+    assert client.get("/posts", headers={"If-None-Match": posts_tag}).status_code == 200
+
+
+def test_users_tag_ignores_post_writes(client, seed):
+    seed(users=2, posts_per_user=1)
+    users_tag = client.get("/users").headers["ETag"]
+
+    client.post("/posts", json={"title": "New", "content": "Body", "user_id": 1})
+    assert client.get("/users", headers={"If-None-Match": users_tag}).status_code == 304
+
+    db.session.execute(db.text("UPDATE users SET email = 'new@example.com' WHERE id = 2"))
+    db.session.commit()
+    assert client.get("/users", headers={"If-None-Match": users_tag}).status_code == 200
+
+
+def test_each_representation_has_its_own_tag(client, seed):
+    seed(users=1, posts_per_user=2)
+    urls = ["/users/1", "/users/1/posts", "/users/1/posts?fields=id"]
+    tags = [client.get(url).headers["ETag"] for url in urls]
+    assert len(set(tags)) == len(urls)
+
+    full_tag = tags[1]
+    assert client.get("/users/1/posts", headers={"If-None-Match": full_tag}).status_code == 304
+    response = client.get("/users/1/posts?fields=id", headers={"If-None-Match": full_tag})
+    assert response.status_code == 200
+    assert response.get_json()["posts"] == [{"id": 1}, {"id": 2}]
+
+
+def test_unknown_user_is_not_tagged(client):
+    response = client.get("/users/42")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
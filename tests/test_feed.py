@@ -0,0 +1,66 @@
+from app import db
+from feed import RecentPosts, feed_statement
+from models import Post
+
+
+def test_feed_lists_newest_posts_with_authors(client, seed):
+    seed(users=3, posts_per_user=2)
+
+    response = client.get("/feed?limit=4")
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert [row["id"] for row in rows] == [6, 5, 4, 3]
+    assert rows[0] == {"id": 6, "title": "T2-1", "content": "Body", "user_id": 3, "username": "user2"}
+
+    cursor = response.headers["X-Next-Cursor"]
+    rest = client.get(f"/feed?limit=4&after={cursor}")
+    assert [row["id"] for row in rest.get_json()] == [2, 1]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_feed_fields_and_errors(client, seed):
+    seed(users=1, posts_per_user=2)
+    assert client.get("/feed?fields=title").get_json() == [
+        {"id": 2, "title": "T0-1"},
+        {"id": 1, "title": "T0-0"},
+    ]
+    assert client.get("/feed?fields=nope").status_code == 400
+    assert client.get("/feed?after=bogus").status_code == 400
+
+
+def test_feed_query_walks_primary_key(app):
+    sql = feed_statement(10, after_id=500).compile(
+        db.engine, compile_kwargs={"literal_binds": True}
+    )
+    plan = " ".join(row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "TEMP B-TREE" not in plan, "newest-first order should come from the primary key"
+    assert "SCAN users" not in plan, "authors should be looked up by primary key"
+
+
+def test_feed_buffer_serves_recent_pages_and_tracks_writes(app, client, seed, query_counter):
+    recent = app.extensions["recent_posts"] = RecentPosts(size=5, ttl=30)
+    seed(users=2, posts_per_user=4)
+
+    assert [row["id"] for row in client.get("/feed?limit=3").get_json()] == [8, 7, 6]
+    assert recent.reloads == 1
+
+    query_counter.clear()
+    assert [row["id"] for row in client.get("/feed?limit=2").get_json()] == [8, 7]
+    assert len(query_counter) == 1, "a warm buffer only checks max(posts.id)"
+    assert recent.hits == 1
+
+    # A Core insert (another process, group commit, /posts/bulk) is prepended.
+    db.session.execute(db.insert(Post).values(title="New", content="C", user_id=1))
+    db.session.commit()
+    assert client.get("/feed?limit=1").get_json()[0]["title"] == "New"
+    assert recent.top_ups == 1 and recent.snapshot()["buffered"] == 5
+
+    # An ORM edit in this process reloads the buffer.
+    db.session.get(Post, 8).title = "Edited"
+    db.session.commit()
+    assert client.get("/feed?limit=2").get_json()[1]["title"] == "Edited"
+    assert recent.reloads == 2
+
+    # Pages past the buffer fall through to the database.
+    rows = client.get("/feed?limit=10").get_json()
+    assert [row["id"] for row in rows] == [9, 8, 7, 6, 5, 4, 3, 2, 1]
@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from models import Post, User
+
+
+@pytest.fixture()
+def group_app(tmp_path):
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'group.db'}",
+            "AUTO_SEED": False,
+            "GROUP_COMMIT_ENABLED": True,
+            "GROUP_COMMIT_MAX_DELAY_MS": 20,
+            "SQLITE_PRAGMAS": {"journal_mode": "WAL", "busy_timeout": 5000, "foreign_keys": "ON"},
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(username="alice"), User(username="bob")])
+        db.session.commit()
+    yield app
+    app.extensions["group_commit"].close()
+
+
+def test_concurrent_posts_share_transactions(group_app):
+    def create(i):
+        client = group_app.test_client()
+        return client.post("/posts", json={"title": f"T{i}", "content": "C", "user_id": 1 + i % 2})
+
+    with ThreadPoolExecutor(16) as pool:
+        responses = list(pool.map(create, range(48)))
+
+    assert {response.status_code for response in responses} == {201}
+    payloads = [response.get_json() for response in responses]
+    assert len({payload["id"] for payload in payloads}) == 48
+    assert payloads[1]["username"] == "bob"
+
+    with group_app.app_context():
+        stored = dict(db.session.execute(db.select(Post.id, Post.title)).all())
+        assert {payload["id"]: payload["title"] for payload in payloads} == stored
+        assert db.session.get(User, 1).post_count == 24
+
+    stats = group_app.extensions["group_commit"].snapshot()
+    assert stats["rows"] == 48
+    assert stats["batches"] < 48
+
+
+def test_failing_row_only_fails_its_own_request(group_app):
+    committer = group_app.extensions["group_commit"]
+    good = committer.submit({"title": "ok", "content": "C", "user_id": 1})
+    bad = committer.submit({"title": "orphan", "content": "C", "user_id": 999})
+
+    assert isinstance(good.result(timeout=5), int)
+    with pytest.raises(Exception, match="FOREIGN KEY"):
+        bad.result(timeout=5)
+    with group_app.app_context():
+        assert [post.title for post in Post.query.all()] == ["ok"]
+
+
+def test_author_deleted_before_commit_is_not_found(group_app, monkeypatch):
+    committer = group_app.extensions["group_commit"]
+    insert_rows = committer._insert_rows
+
+    def delete_author_first(batch):
+        with committer.engine.begin() as connection:
+            connection.execute(db.delete(User).where(User.id == 2))
+        return insert_rows(batch)
+
+    monkeypatch.setattr(committer, "_insert_rows", delete_author_first)
+    response = group_app.test_client().post(
+        "/posts", json={"title": "T", "content": "C", "user_id": 2}
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "User not found"}
+
+
+def test_slow_or_locked_database_returns_503(group_app, monkeypatch):
+    committer = group_app.extensions["group_commit"]
+    client = group_app.test_client()
+    post = {"title": "T", "content": "C", "user_id": 1}
+
+    def locked(batch):
+        error = sqlite3.OperationalError("database is locked")
+        raise OperationalError("INSERT INTO posts", {}, error)
+
+    monkeypatch.setattr(committer, "_insert_rows", locked)
+    response = client.post("/posts", json=post)
+    assert response.status_code == 503
+    assert "database is locked" in response.get_json()["message"]
+
+    release = threading.Event()
+    monkeypatch.setattr(committer, "_insert_rows", lambda batch: release.wait() and [1])
+    group_app.config["GROUP_COMMIT_TIMEOUT"] = 0.05
+    try:
+        response = client.post("/posts", json=post)
+    finally:
+        release.set()
+    assert response.status_code == 503
+    assert "may still be created" in response.get_json()["message"]
@@ -0,0 +1,46 @@
+import json
+import logging
+
+from app import create_app, db
+
+
+def _instrumented_app(tmp_path, **overrides):
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+        "INSTRUMENTATION_ENABLED": True,
+        "PROFILE_DIR": str(tmp_path / "profiles"),
+    }
+    config.update(overrides)
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_server_timing_and_structured_log(tmp_path, caplog):
+    app = _instrumented_app(tmp_path, SLOW_QUERY_MS=0)
+    with caplog.at_level(logging.INFO, logger="instrumentation"):
+        response = app.test_client().get("/verify")
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert 'desc="3 queries"' in timing
+
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.levelno == logging.INFO]
+    assert records[-1]["path"] == "/verify"
+    assert records[-1]["sql_queries"] == 3
+    assert len(records[-1]["slowest"]) == 3
+    assert any(r.getMessage().startswith("slow query") for r in caplog.records)
+
+
+def test_profile_sampling_writes_one_in_n(tmp_path):
+    app = _instrumented_app(tmp_path, PROFILE_SAMPLE_RATE=2)
+    client = app.test_client()
+    for _ in range(4):
+        client.get("/users")
+    assert len(list((tmp_path / "profiles").glob("*.prof"))) == 2
+
+
+def test_disabled_by_default(client):
+    assert "Server-Timing" not in client.get("/").headers
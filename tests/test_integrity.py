@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from integrity import readonly_engine
+from models import Post, User
+
+# A legacy schema without the constraints the models declare, so every kind
+# of problem the checker looks for can exist.
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(80), "
+    "email VARCHAR(120), post_count INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE posts (id INTEGER PRIMARY KEY, title VARCHAR(200), "
+    "content TEXT, user_id INTEGER)",
+]
+
+
+@pytest.fixture()
+def file_app(tmp_path):
+    app = create_app(
+        {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'check.db'}"}
+    )
+    with app.app_context():
+        yield app
+        db.engine.dispose()
+
+
+def _check(app, *args):
+    return app.test_cli_runner().invoke(
+        args=["integrity-check", "--workers", "2", "--chunk-size", "3", *args]
+    )
+
+
+def test_clean_database_passes(file_app):
+    db.create_all()
+    users = [User(username=f"user{i}", email=f"user{i}@example.com") for i in range(5)]
+    db.session.add_all(users + [Post(title="T", content="C", user=user) for user in users])
+    db.session.commit()
+
+    result = _check(file_app)
+    assert result.exit_code == 0, result.output
+    assert "No integrity problems found." in result.stdout
+
+
+def test_reports_orphans_duplicates_and_nulls(file_app):
+    for statement in LEGACY_SCHEMA:
+        db.session.execute(db.text(statement))
+    db.session.execute(
+        db.text(
+            "INSERT INTO users (id, username, email) VALUES "
+            "(1, 'ann', 'a@example.com'), (2, 'bob', 'a@example.com'), "
+            "(3, NULL, 'c@example.com'), (4, 'ann', NULL)"
+        )
+    )
+    db.session.execute(
+        db.text(
+            "INSERT INTO posts (id, title, content, user_id) VALUES "
+            "(1, 'ok', 'c', 1), (2, 'orphan', 'c', 99), (3, NULL, 'c', 2), "
+            "(4, 'ok', 'c', 3), (5, 'ok', NULL, NULL), (6, 'orphan', 'c', 42), (7, 'ok', 'c', 4)"
+        )
+    )
+    db.session.commit()
+
+    result = _check(file_app, "--samples", "1")
+
+    assert result.exit_code == 1
+    lines = result.stdout.splitlines()
+    assert "duplicate users.email: 'a@example.com' in 2 rows, first is user 1" in lines
+    assert "duplicate users.username: 'ann' in 2 rows, first is user 1" in lines
+    assert "NULL in users: users 3: NULL username" in lines
+    assert "NULL in posts: 2 total" in lines
+    # Only the first example per check is printed, but every orphan is counted.
+    assert len([line for line in lines if line.startswith("orphaned posts: post")]) == 1
+    assert "orphaned posts: 2 total" in lines
+    assert "[7/7] checked" in result.stderr
+    assert "7 integrity problems found." in result.stderr
+
+
+def test_rejects_in_memory_database(runner):
+    result = runner.invoke(args=["integrity-check"])
+    assert result.exit_code == 1
+    assert "in-memory" in result.output
+
+
+def test_worker_connections_are_read_only(file_app):
+    db.create_all()
+    engine = readonly_engine(db.engine.url)
+    with engine.connect() as connection:
+        assert connection.execute(db.select(db.func.count(User.id))).scalar() == 0
+        with pytest.raises(OperationalError, match="readonly"):
+            connection.execute(db.insert(User).values(username="x"))
+    engine.dispose()
@@ -47,3 +47,17 @@ def test_repr_helpers_include_names(title, content, app):
 
     assert "tester" in repr(user)
     assert title in repr(post)
+
+
+def _query_plan(sql):
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return " ".join(row[-1] for row in rows)
+
+
+def test_per_user_post_lookups_use_index(app):
+    plan = _query_plan("SELECT id, title FROM posts WHERE user_id = 1 ORDER BY id")
+    assert "ix_posts_user_id_id" in plan
+    assert "TEMP B-TREE" not in plan, "ordering by id should come from the index"
+
+    plan = _query_plan("SELECT id FROM posts WHERE user_id IN (1, 2, 3) ORDER BY id")
+    assert "ix_posts_user_id_id" in plan
@@ -0,0 +1,80 @@
+import pytest
+import sqlalchemy as sa
+
+from app import create_app, db
+from migrations.online import STATE_TABLE, copy_and_swap
+from models import Post
+from seed import seed_synthetic_data
+
+
+def posts_table():
+    """``posts`` with an extra ``summary`` column, as a revision would declare it."""
+    return sa.Table(
+        "posts",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("summary", sa.String(20), nullable=False, server_default=""),
+        sa.Index("ix_posts_user_id_id", "user_id", "id"),
+    )
+
+
+class Interrupt(Exception):
+    pass
+
+
+@pytest.fixture()
+def file_app(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'online.db'}", "AUTO_SEED": False})
+    with app.app_context():
+        db.create_all()
+        seed_synthetic_data(50, 4)
+        yield app
+
+
+def test_copy_and_swap_resumes_and_keeps_writes(file_app):
+    engine = db.engine
+    options = dict(name="test", expressions={"summary": "substr({row}.title, 1, 6)"}, chunk_size=40)
+
+    def stop_after_two_chunks(state):
+        if state["last_key"] >= 80:
+            raise Interrupt
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        with pytest.raises(Interrupt):
+            copy_and_swap(connection, posts_table(), progress=stop_after_two_chunks, **options)
+        assert connection.exec_driver_sql(f"SELECT last_key FROM {STATE_TABLE}").scalar() == 80
+
+    # Writes between the interruption and the resume reach the shadow via triggers.
+    db.session.add(Post(title="Late arrival", content="written mid-migration", user_id=3))
+    db.session.get(Post, 10).title = "Edited title"
+    db.session.delete(db.session.get(Post, 150))
+    db.session.commit()
+
+    progress = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        copy_and_swap(connection, posts_table(), progress=progress.append, **options)
+    assert progress[0]["last_key"] == 120  # resumed after the checkpoint
+    assert progress[-1]["percent"] == 100.0
+
+    db.session.remove()
+    rows = db.session.execute(sa.text("SELECT id, title, summary FROM posts ORDER BY id")).all()
+    assert len(rows) == 200
+    assert rows[9] == (10, "Edited title", "Edited")
+    assert rows[-1][1:] == ("Late arrival", "Late a")
+    assert 150 not in {row[0] for row in rows}
+
+    inspector = sa.inspect(db.engine)
+    assert not inspector.has_table("_posts_new")
+    assert not inspector.has_table("_posts_old")
+    assert [index["name"] for index in inspector.get_indexes("posts")] == ["ix_posts_user_id_id"]
+    assert db.session.execute(sa.text(f"SELECT count(*) FROM {STATE_TABLE}")).scalar() == 0
+
+    # The FTS and post_count triggers were carried over to the new table.
+    db.session.add(Post(title="Swapped table", content="still indexed", user_id=1))
+    db.session.commit()
+    client = file_app.test_client()
+    assert [row["title"] for row in client.get("/posts/search?q=swapped").get_json()] == ["Swapped table"]
+    assert client.get("/verify?summary=1").get_json()["users"][0]["posts_count"] == 5
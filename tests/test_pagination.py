@@ -0,0 +1,47 @@
+import json
+
+
+def test_users_keyset_pages_follow_cursor(client, seed):
+    seed(users=5, posts_per_user=0)
+
+    first = client.get("/users?limit=2")
+    assert first.status_code == 200
+    assert [u["username"] for u in first.get_json()] == ["user0", "user1"]
+    cursor = first.headers["X-Next-Cursor"]
+    assert 'rel="next"' in first.headers["Link"]
+
+    seen = [u["id"] for u in first.get_json()]
+    while cursor:
+        page = client.get(f"/users?limit=2&after={cursor}")
+        seen.extend(u["id"] for u in page.get_json())
+        cursor = page.headers.get("X-Next-Cursor")
+
+    assert seen == sorted(seen) and len(seen) == 5
+
+
+def test_posts_page_includes_author(client, seed):
+    seed(users=2, posts_per_user=2)
+
+    response = client.get("/posts?limit=3")
+    posts = response.get_json()
+    assert len(posts) == 3
+    assert posts[0]["username"] == "user0"
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_invalid_pagination_arguments_rejected(client):
+    assert client.get("/posts?limit=0").status_code == 400
+    assert client.get("/posts?after=not-a-cursor").status_code == 400
+    assert client.get("/users?stream=xml").status_code == 400
+
+
+def test_streaming_formats(client, seed):
+    seed(users=3, posts_per_user=1)
+
+    ndjson = client.get("/posts?stream=ndjson")
+    assert ndjson.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert [p["title"] for p in lines] == ["T0-0", "T1-0", "T2-0"]
+
+    array = client.get("/users?stream=json")
+    assert [u["username"] for u in array.get_json()] == ["user0", "user1", "user2"]
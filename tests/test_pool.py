@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import create_app, db
+from config import Config
+from pool import PoolMetrics, TimedQueuePool, pool_options
+
+
+def test_pool_options_follow_config():
+    config = {name: getattr(Config, name) for name in dir(Config) if name.startswith("DB_POOL")}
+    config["DB_MAX_OVERFLOW"] = 3
+    options = pool_options(config)
+    assert options["poolclass"] is TimedQueuePool
+    assert options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is Config.DB_POOL_PRE_PING
+
+
+def test_timed_pool_records_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    with engine.connect():
+        assert metrics.snapshot()["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_max_ms"] >= 50
+    assert snapshot["checked_out"] == 0
+
+
+def test_metrics_endpoint_reports_pool_usage(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'metrics.db'}",
+            "METRICS_ENABLED": True,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.get("/users")
+
+    pool = client.get("/metrics").get_json()["pool"]
+    assert pool["checkouts"] >= 1
+    assert pool["checked_out"] == 0
+
+
+def test_metrics_endpoint_disabled_by_default(client):
+    assert client.get("/metrics").status_code == 404
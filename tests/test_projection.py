@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "url,items",
+    [
+        ("/posts?fields=title", lambda data: data),
+        ("/users/1/posts?fields=title", lambda data: data["posts"]),
+        ("/verify?fields=id,title", lambda data: data["posts"]),
+    ],
+)
+def test_sparse_fieldsets_skip_content_column(client, seed, query_counter, url, items):
+    seed(users=1, posts_per_user=2)
+    query_counter.clear()
+
+    response = client.get(url)
+    assert response.status_code == 200
+    for item in items(response.get_json()):
+        assert set(item) == {"id", "title"}
+    assert not any("posts.content" in statement for statement in query_counter)
+
+
+def test_posts_fields_without_username_skip_join(client, seed, query_counter):
+    seed(users=1, posts_per_user=1)
+    query_counter.clear()
+
+    assert client.get("/posts?fields=id,user_id").get_json() == [{"id": 1, "user_id": 1}]
+    assert not any("JOIN users" in statement for statement in query_counter)
+
+
+def test_users_fields_and_unknown_field(client, seed):
+    seed(users=2, posts_per_user=0)
+    assert client.get("/users?fields=username").get_json() == [
+        {"id": 1, "username": "user0"},
+        {"id": 2, "username": "user1"},
+    ]
+    assert client.get("/users?fields=password").status_code == 400
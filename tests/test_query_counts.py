@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import event
+
+from database import db
+
+
+def _statements_for(client, query_counter, url):
+    # Measure the database path, not the read-through cache.
+    client.application.extensions["user_cache"].clear()
+    query_counter.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return len(query_counter)
+
+
+@pytest.mark.parametrize(
+    "url", ["/verify", "/posts", "/feed", "/users", "/users/1", "/users/1/posts"]
+)
+def test_read_endpoints_issue_constant_queries(client, seed, query_counter, url):
+    seed(users=2, posts_per_user=2)
+    small = _statements_for(client, query_counter, url)
+
+    seed(users=20, posts_per_user=5)
+    large = _statements_for(client, query_counter, url)
+
+    assert large == small, f"{url} query count grows with row count"
+
+
+def test_create_post_probes_author_once(client, seed, query_counter):
+    seed(users=1, posts_per_user=0)
+    query_counter.clear()
+    response = client.post("/posts", json={"title": "T", "content": "C", "user_id": "1"})
+
+    assert response.status_code == 201
+    assert response.get_json() == {
+        "id": 1, "title": "T", "content": "C", "user_id": 1, "username": "user0",
+    }
+    # One id/username probe and the insert: no User hydration, refresh or lazy load.
+    assert [s.split()[0] for s in query_counter] == ["SELECT", "INSERT"]
+    assert "users.email" not in query_counter[0]
+
+
+def test_create_post_maps_foreign_key_error(app, client, seed):
+    seed(users=1, posts_per_user=0)
+    db.session.execute(db.text("PRAGMA foreign_keys = ON"))
+
+    def delete_author(conn, cursor, statement, parameters, context, executemany):
+        # The author disappears between the probe and the insert.
+        if statement.startswith("INSERT INTO posts"):
+            cursor.execute("DELETE FROM users WHERE id = 1")
+
+    event.listen(db.engine, "before_cursor_execute", delete_author)
+    try:
+        response = client.post("/posts", json={"title": "T", "content": "C", "user_id": 1})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", delete_author)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "User not found"}
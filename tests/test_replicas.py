@@ -0,0 +1,92 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from app import create_app, db
+from models import User
+
+
+def replica_url(path):
+    # Read-only, and a missing file fails to open instead of being created.
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+
+def add_marker(path, username):
+    """Write a row to a replica file only, so reads can be traced to it."""
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO users (username, post_count) VALUES (?, 0)", (username,))
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture()
+def replicated(tmp_path):
+    primary = tmp_path / "primary.db"
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}", "AUTO_SEED": False})
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="alice"))
+        db.session.commit()
+        db.engine.dispose()
+
+    replicas = [tmp_path / "replica0.db", tmp_path / "replica1.db"]
+    for index, path in enumerate(replicas):
+        shutil.copy(primary, path)
+        add_marker(path, f"replica{index}")
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+            "DB_REPLICA_URLS": [replica_url(path) for path in replicas],
+            "DB_REPLICA_CHECK_INTERVAL": 0,
+            "CACHE_BACKEND": "null",
+            "AUTO_SEED": False,
+            "METRICS_ENABLED": True,
+        }
+    )
+    return app, replicas
+
+
+def usernames(client):
+    response = client.get("/users")
+    assert response.status_code == 200
+    return {row["username"] for row in response.get_json()}
+
+
+def test_reads_round_robin_over_replicas(replicated):
+    app, _ = replicated
+    client = app.test_client()
+
+    served = [usernames(client) - {"alice"} for _ in range(4)]
+    assert served == [{"replica0"}, {"replica1"}, {"replica0"}, {"replica1"}]
+    assert client.get("/verify?summary=1").get_json()["users_count"] == 2
+
+    stats = client.get("/metrics").get_json()["replicas"]
+    assert {key: value["reads"] for key, value in stats["replicas"].items()} == {
+        "replica_0": 3,
+        "replica_1": 2,
+    }
+
+
+def test_writer_reads_own_writes_from_primary(replicated):
+    app, _ = replicated
+    writer, other = app.test_client(), app.test_client()
+
+    assert writer.post("/users", json={"username": "bob"}).status_code == 201
+    assert usernames(writer) == {"alice", "bob"}
+    assert "bob" not in usernames(other)
+
+
+def test_unhealthy_replica_is_skipped(replicated):
+    app, replicas = replicated
+    replicas[0].unlink()
+    client = app.test_client()
+
+    assert [usernames(client) - {"alice"} for _ in range(3)] == [{"replica1"}] * 3
+    stats = client.get("/metrics").get_json()["replicas"]
+    assert stats["replicas"]["replica_0"]["healthy"] is False
+
+    replicas[1].unlink()
+    app.extensions["replicas"].engines["replica_1"].dispose()  # drop the open file handle
+    assert usernames(client) == {"alice"}  # primary fallback
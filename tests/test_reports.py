@@ -0,0 +1,39 @@
+from app import db
+from models import Post
+from reports import integrity_report, posts_per_user_statement, verify_statements
+
+
+def test_integrity_report_counts_and_orphans(app, seed):
+    seed(users=3, posts_per_user=2)
+    db.session.add(Post(title="Orphan", content="No author", user_id=999))
+    db.session.commit()
+
+    report = integrity_report()
+    assert report["users_count"] == 3
+    assert report["posts_count"] == 7
+    assert report["orphaned_posts"] == 1
+    assert [u["posts_count"] for u in report["users"]] == [2, 2, 2]
+
+
+def test_verify_summary_uses_two_statements(client, seed, query_counter):
+    seed(users=4, posts_per_user=3)
+    query_counter.clear()
+
+    response = client.get("/verify?summary=1")
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["posts_count"] == 12
+    assert "posts" not in payload
+    assert len(query_counter) == 2
+
+
+def test_dialects_without_count_triggers_group_posts(app, seed):
+    seed(users=3, posts_per_user=2)
+    db.session.execute(db.text("UPDATE users SET post_count = 0"))
+    db.session.add(Post(title="Extra", content="Body", user_id=2))
+    db.session.commit()
+
+    rows = db.session.execute(posts_per_user_statement(dialect="mysql")).all()
+    assert [row.posts_count for row in rows] == [2, 3, 2]
+    users, _ = verify_statements(dialect="mysql")
+    assert [row[-1] for row in db.session.execute(users)] == [2, 3, 2]
@@ -0,0 +1,73 @@
+import pytest
+
+from app import db
+from models import Post, User
+
+
+def _posts(*items):
+    user = User(username="writer")
+    db.session.add(user)
+    db.session.add_all(Post(title=title, content=content, user=user) for title, content in items)
+    db.session.commit()
+
+
+def test_search_ranks_title_matches_first_and_highlights(client, app):
+    _posts(
+        ("Gardening notes", "Tomatoes need sun. Also sqlalchemy is unrelated here."),
+        ("SQLAlchemy tips", "Use selectinload for collections."),
+        ("Cooking", "Nothing relevant."),
+    )
+
+    results = client.get("/posts/search?q=sqlalchemy").get_json()
+    assert [r["title"] for r in results] == ["SQLAlchemy tips", "Gardening notes"]
+    assert results[0]["username"] == "writer"
+    assert "<mark>" in results[1]["snippet"]
+
+
+def test_search_index_follows_updates_and_deletes(client, app):
+    _posts(("Draft", "placeholder text"))
+    post = db.session.get(Post, 1)
+    post.content = "final wording"
+    db.session.commit()
+
+    assert client.get("/posts/search?q=placeholder").get_json() == []
+    assert len(client.get("/posts/search?q=wording").get_json()) == 1
+
+    db.session.delete(post)
+    db.session.commit()
+    assert client.get("/posts/search?q=wording").get_json() == []
+
+
+def test_search_keyset_pages_and_sanitises_input(client, app):
+    _posts(*[(f"Note {i}", "shared keyword") for i in range(5)])
+
+    seen, cursor = [], None
+    while True:
+        url = "/posts/search?q=keyword&limit=2" + (f"&after={cursor}" if cursor else "")
+        response = client.get(url)
+        seen.extend(r["id"] for r in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+
+    assert client.get('/posts/search?q=keyword" OR title:*').status_code == 200
+    assert client.get("/posts/search?q=%20").status_code == 400
+
+
+def test_like_fallback_without_fts_index(client, app):
+    _posts(("Fallback", "works with 100% LIKE matching"))
+    app.extensions["search_fts"] = False
+
+    results = client.get("/posts/search?q=like").get_json()
+    assert [r["title"] for r in results] == ["Fallback"]
+    assert results[0]["rank"] is None
+
+
+@pytest.mark.parametrize("fts", [True, False])
+def test_snippets_escape_post_html(client, app, fts):
+    _posts(("Greeting", "hello <img src=x onerror=alert(1)> world"))
+    app.extensions["search_fts"] = fts
+
+    [result] = client.get("/posts/search?q=hello").get_json()
+    assert result["snippet"] == "<mark>hello</mark> &lt;img src=x onerror=alert(1)&gt; world"
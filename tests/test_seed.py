@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app import create_app, db
+from models import Post, User
+
+
+def test_seed_command_loads_sample_and_generated_rows(app, runner):
+    result = runner.invoke(args=["seed", "--users", "3", "--posts-per-user", "2"])
+    assert result.exit_code == 0, result.output
+
+    assert User.query.count() == 6
+    assert Post.query.count() == 10
+
+    # Running again must not duplicate the sample set
+    runner.invoke(args=["seed"])
+    assert User.query.filter_by(username="alice").count() == 1
+
+
+def test_auto_seed_queries_only_on_first_request(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'auto.db'}", "AUTO_SEED": True})
+    with app.app_context():
+        db.create_all()
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        client = app.test_client()
+        client.get("/")
+        assert User.query.count() == 3
+
+        statements.clear()
+        client.get("/")
+        assert statements == []
+
+
+def test_zipf_distribution_is_skewed_and_deterministic(app):
+    from seed import seed_synthetic_data
+
+    assert seed_synthetic_data(200, "zipf:5", seed=3) == (200, 1000)
+    counts = sorted(
+        (count for _, count in db.session.query(Post.user_id, db.func.count()).group_by(Post.user_id)),
+        reverse=True,
+    )
+    # A handful of authors write most posts; many write none.
+    assert sum(counts[:10]) > 500
+    assert len(counts) < 200
+
+    first = db.session.execute(db.select(Post.user_id, Post.content).order_by(Post.id)).all()
+    db.drop_all()
+    db.create_all()
+    seed_synthetic_data(200, "zipf:5", seed=3)
+    assert db.session.execute(db.select(Post.user_id, Post.content).order_by(Post.id)).all() == first
+    assert len({len(content) for _, content in first}) > 50
+
+
+def test_generated_posts_are_searchable(app, client):
+    from seed import seed_synthetic_data
+
+    seed_synthetic_data(10, 3)
+    response = client.get("/posts/search?q=user10")
+    assert sorted(row["title"] for row in response.get_json()) == [
+        "Post 1 by user10",
+        "Post 2 by user10",
+        "Post 3 by user10",
+    ]
+
+
+def test_seed_command_rejects_unknown_distribution(app, runner):
+    result = runner.invoke(args=["seed", "--users", "3", "--posts-per-user", "pareto:2"])
+    assert result.exit_code != 0
+    assert "zipf:MEAN" in result.output
+
+
+def _trigger_names(prefix):
+    return set(
+        db.session.execute(
+            db.text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE :prefix"),
+            {"prefix": f"{prefix}%"},
+        ).scalars()
+    )
+
+
+def test_failed_seed_keeps_index_and_count_triggers(app):
+    from seed import seed_synthetic_data
+
+    triggers = _trigger_names("posts_")
+    assert {"posts_fts_ai", "posts_count_ai", "posts_count_ad", "posts_count_au"} <= triggers
+    # Generated usernames collide with an existing "user2" partway through.
+    db.session.add(User(username="user2"))
+    db.session.commit()
+
+    with pytest.raises(IntegrityError):
+        seed_synthetic_data(3, 1)
+    assert _trigger_names("posts_") == triggers
+    db.session.rollback()
+    assert _trigger_names("posts_") == triggers
+
+    # New posts are still indexed for search and counted.
+    db.session.add(Post(title="Findable", content="after a failed seed", user_id=1))
+    db.session.commit()
+    assert db.session.execute(
+        db.text("SELECT count(*) FROM posts_fts WHERE posts_fts MATCH 'findable'")
+    ).scalar() == 1
+    assert db.session.get(User, 1).post_count == 1
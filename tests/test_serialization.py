@@ -0,0 +1,21 @@
+import datetime
+
+import pytest
+
+from app import create_app
+from serialization import OrjsonProvider, StdlibJSONProvider
+
+
+def test_json_provider_selection_and_output():
+    slow = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "JSON_PROVIDER": "stdlib"})
+    assert isinstance(slow.json, StdlibJSONProvider)
+
+    pytest.importorskip("orjson")
+    fast = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:", "JSON_PROVIDER": "orjson"})
+    assert isinstance(fast.json, OrjsonProvider)
+
+    payload = {"id": 1, "when": datetime.date(2024, 1, 2), "tags": ["a", "é"]}
+    with fast.app_context(), slow.app_context():
+        assert fast.json.loads(fast.json.response(payload).get_data()) == slow.json.loads(
+            slow.json.response(payload).get_data()
+        )